@@ -0,0 +1,182 @@
+"""提醒音生成函数的性能基准
+
+对每个提醒音生成函数重复计时，并用 tracemalloc 记录峰值内存，结果输出为 JSON。
+synth 包用 LRU 缓存保存滤波器系数、噪声表、波表等，冷启动（每次调用前清空缓存，
+相当于进程里第一次渲染）和热启动（缓存已填满）的耗时分别报告。
+可以与保存的基线比较，超过阈值时以非零状态退出，用作性能回归门禁。
+只调用合成函数，不写文件、不需要音频设备，可在无界面的 Linux 上运行。
+
+    python scripts/bench_notification_voice.py --save bench_baseline.json
+    python scripts/bench_notification_voice.py --baseline bench_baseline.json
+"""
+import argparse
+import importlib
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import scipy
+
+import notification_voice
+
+# synth 包中按参数缓存结果的函数：(模块, 函数名)
+SYNTH_CACHES = [
+    ("synth.additive", "_plan"),
+    ("synth.effects", "design"),
+    ("synth.noise", "_shape"),
+    ("synth.noise", "_table"),
+    ("synth.reverb", "impulse_response"),
+    ("synth.wavetable", "_table"),
+]
+
+
+def clear_caches():
+    """清空 synth 包的 LRU 缓存，下一次调用按冷启动计算"""
+    for module, name in SYNTH_CACHES:
+        getattr(importlib.import_module(module), name).cache_clear()
+
+
+def _timings(func, repeats, cold):
+    times = []
+    for _ in range(repeats):
+        if cold:
+            clear_caches()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def measure(func, repeats=10, warmup=1):
+    """返回一个函数冷启动和热启动的计时（秒）以及冷启动的 tracemalloc 峰值内存（字节）"""
+    for _ in range(warmup):
+        func()
+
+    cold = _timings(func, repeats, cold=True)
+    warm = _timings(func, repeats, cold=False)
+
+    # 峰值内存单独测一次，tracemalloc 本身会拖慢计时；缓存清空后测，计入缓存表本身的内存
+    clear_caches()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "cold_time_min": min(cold),
+        "cold_time_median": statistics.median(cold),
+        "time_min": min(warm),
+        "time_median": statistics.median(warm),
+        "time_mean": statistics.fmean(warm),
+        "peak_bytes": peak,
+        "repeats": repeats,
+    }
+
+
+def run(names=None, repeats=10, warmup=1):
+    names = list(notification_voice.SOUNDS) if not names else list(names)
+    results = {}
+    for name in names:
+        params = notification_voice.sound_params(name)
+        func = notification_voice.SOUNDS[name]
+        results[name] = measure(lambda: func(**params), repeats=repeats, warmup=warmup)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "scipy": scipy.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "sample_rate": notification_voice.SAMPLE_RATE,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, time_threshold=0.25, memory_threshold=0.10):
+    """与基线比较，返回回归列表 [(名称, 指标, 基线值, 当前值, 相对变化)]
+
+    计时比较冷启动和热启动的最小值（受调度噪声影响最小），内存比较峰值字节数。
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        for metric, threshold in (("cold_time_min", time_threshold), ("time_min", time_threshold),
+                                  ("peak_bytes", memory_threshold)):
+            if not base.get(metric):
+                continue
+            change = result[metric] / base[metric] - 1
+            if change > threshold:
+                regressions.append((name, metric, base[metric], result[metric], change))
+    return regressions
+
+
+def _format(metric, value):
+    if metric == "peak_bytes":
+        return f"{value / 1e6:.2f} MB"
+    return f"{value * 1000:.2f} ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="提醒音生成函数的计时和峰值内存基准")
+    parser.add_argument("names", nargs="*", metavar="NAME",
+                        help="要测试的提醒音名称，默认全部")
+    parser.add_argument("-n", "--repeats", type=int, default=10, help="每个函数的计时次数（默认 10）")
+    parser.add_argument("--warmup", type=int, default=1, help="计时前的预热次数（默认 1）")
+    parser.add_argument("-o", "--output", metavar="PATH",
+                        help="把结果 JSON 写入文件，- 表示标准输出")
+    parser.add_argument("--save", metavar="PATH", help="把结果保存为新的基线")
+    parser.add_argument("--baseline", metavar="PATH", help="与此基线比较，出现回归时以状态 1 退出")
+    parser.add_argument("--time-threshold", type=float, default=0.25,
+                        help="允许的计时相对增幅（默认 0.25，即慢 25%% 算回归）")
+    parser.add_argument("--memory-threshold", type=float, default=0.10,
+                        help="允许的峰值内存相对增幅（默认 0.10）")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.names if name not in notification_voice.SOUNDS]
+    if unknown:
+        parser.error("未知的提醒音: " + ", ".join(unknown))
+
+    current = run(args.names, repeats=args.repeats, warmup=args.warmup)
+
+    # 结果输出到标准输出时，表格写到标准错误，保证 JSON 可以直接被管道读取
+    log = sys.stderr if args.output == "-" else sys.stdout
+    for name, result in current["results"].items():
+        print(f"{name:24s} {_format('cold_time_min', result['cold_time_min']):>12s} "
+              f"{_format('time_min', result['time_min']):>12s} "
+              f"{_format('time_median', result['time_median']):>12s} "
+              f"{_format('peak_bytes', result['peak_bytes']):>10s}", file=log)
+
+    payload = json.dumps(current, indent=2, sort_keys=True)
+    if args.output == "-":
+        print(payload)
+    elif args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.time_threshold, args.memory_threshold)
+        if regressions:
+            print("\n性能回归:", file=log)
+            for name, metric, before, after, change in regressions:
+                print(f"- {name} {metric}: {_format(metric, before)} -> {_format(metric, after)} "
+                      f"(+{change:.0%})", file=log)
+            return 1
+        print("\n与基线相比没有性能回归", file=log)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""常驻的提醒音渲染服务
+
+每次预览都重新启动 Python、导入 NumPy / SciPy 再运行脚本，冷启动时间远大于渲染本身。
+守护进程保持解释器和 SciPy 已加载，最近的渲染结果放在 LRU 缓存里，重复预览几毫秒内返回。
+
+通过标准输入输出或 Unix 套接字通信，每个请求是一行 JSON：
+
+    {"id": 1, "name": "clean_bell", "params": {"base_freq": 1200}}
+    {"id": 2, "name": "gentle_ding_dong", "format": "path", "profile": "compact", "reverb": "hall"}
+    {"cmd": "variant", "name": "peaceful_chimes"}
+    {"cmd": "list"} / {"cmd": "stats"} / {"cmd": "ping"} / {"cmd": "shutdown"}
+
+每个响应是一行 JSON。format 为 pcm（默认）时，响应行之后紧跟 bytes 个字节的
+小端 16 位单声道 PCM；format 为 path 时，按导出配置写入文件并返回 path。
+variant 命令轮换返回随机化提醒音的预渲染变体路径，从不等待渲染，变体池不满时在后台线程中补足。
+
+    python scripts/notification_daemon.py                      # 标准输入输出
+    python scripts/notification_daemon.py --socket /tmp/nv.sock
+"""
+import argparse
+import collections
+import json
+import os
+import socketserver
+import sys
+import tempfile
+import time
+
+import notification_voice
+from synth import PROFILES, REVERBS, MasterRender, to_pcm
+
+
+class RenderCache:
+    """按 (名称, 参数, 混响) 缓存 float32 母版的 LRU"""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = collections.OrderedDict()
+
+    def get(self, name, params, reverb=None):
+        key = (name, json.dumps(params, sort_keys=True), reverb)
+        master = self._items.get(key)
+        if master is not None:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return master
+        self.misses += 1
+        master = MasterRender(notification_voice.render(name, reverb=reverb, **params), params["sample_rate"])
+        self._items[key] = master
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+        return master
+
+    def __len__(self):
+        return len(self._items)
+
+
+class Daemon:
+    """处理单个请求，与传输方式无关"""
+
+    def __init__(self, cache_size=64, directory=None, variants=8):
+        self.cache = RenderCache(cache_size)
+        self.variants = notification_voice.VariantPool(variants)
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "notification_voice")
+        self.running = True
+
+    def warm(self):
+        """预先导入 SciPy 并渲染一遍所有提醒音的默认参数"""
+        from scipy import signal  # noqa: F401
+        from scipy.io import wavfile  # noqa: F401
+
+        for name in notification_voice.SOUNDS:
+            self.cache.get(name, notification_voice.sound_params(name))
+
+    def handle(self, request):
+        """返回 (响应字典, 随后发送的字节或 None)"""
+        if not isinstance(request, dict):
+            raise TypeError("请求必须是 JSON 对象")
+        cmd = request.get("cmd", "render")
+        if cmd == "ping":
+            return {"ok": True}, None
+        if cmd == "list":
+            return {"ok": True, "sounds": list(notification_voice.SOUNDS)}, None
+        if cmd == "stats":
+            return {"ok": True, "cached": len(self.cache), "hits": self.cache.hits,
+                    "misses": self.cache.misses}, None
+        if cmd == "variant":
+            return {"ok": True, "path": self.variants.next(request["name"])}, None
+        if cmd == "shutdown":
+            self.running = False
+            return {"ok": True}, None
+        if cmd != "render":
+            raise ValueError(f"未知的命令: {cmd}")
+
+        name = request["name"]
+        if name not in notification_voice.SOUNDS:
+            raise ValueError(f"未知的提醒音: {name}")
+        overrides = request.get("params", {})
+        params = notification_voice.sound_params(name, **overrides)
+        unknown = set(overrides) - set(params)
+        if unknown:
+            raise ValueError(f"{name} 不接受参数: " + ", ".join(sorted(unknown)))
+        for key in ("duration", "sample_rate"):
+            if key in params and not params[key] > 0:
+                raise ValueError(f"{key} 必须为正数: {params[key]}")
+        reverb = request.get("reverb")
+        if reverb is not None and reverb not in REVERBS:
+            raise ValueError(f"未知的混响: {reverb}")
+        profile_name = request.get("profile", "release")
+        profile = PROFILES[profile_name]
+        master = self.cache.get(name, params, reverb)
+
+        if request.get("format", "pcm") == "path":
+            path = request.get("path")
+            if not path:
+                # 默认路径由内容哈希决定，同样的请求直接复用已写出的文件
+                digest = notification_voice.sound_hash(name, params, reverb)[:16]
+                path = os.path.join(self.directory, f"{name}_{digest}_{profile_name}{profile.extension}")
+            if request.get("path") or not os.path.exists(path):
+                master.export(profile, path)
+            return {"ok": True, "path": path, "sample_rate": profile.sample_rate}, None
+
+        pcm = to_pcm(master.at_rate(profile.sample_rate), 16).astype("<i2", copy=False).tobytes()
+        return {"ok": True, "sample_rate": profile.sample_rate, "channels": 1, "dtype": "int16",
+                "samples": len(pcm) // 2, "bytes": len(pcm)}, pcm
+
+    def serve(self, rfile, wfile):
+        """逐行读取请求直到 EOF 或 shutdown，rfile / wfile 为二进制流"""
+        for line in rfile:
+            if not line.strip():
+                continue
+            start = time.perf_counter()
+            request = {}
+            try:
+                request = json.loads(line)
+                response, payload = self.handle(request)
+            except Exception as e:
+                # 单个请求的任何错误（包括写文件失败、缺少可选依赖）都只回复给该请求，服务继续运行
+                response, payload = {"ok": False, "error": f"{type(e).__name__}: {e}"}, None
+            if isinstance(request, dict) and "id" in request:
+                response["id"] = request["id"]
+            response["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            if payload is not None:
+                wfile.write(payload)
+            wfile.flush()
+            if not self.running:
+                break
+
+
+def serve_socket(daemon, path):
+    """在 Unix 套接字上逐个连接地服务，渲染串行进行"""
+    if os.path.exists(path):
+        os.unlink(path)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            daemon.serve(self.rfile, self.wfile)
+
+    with socketserver.UnixStreamServer(path, Handler) as server:
+        try:
+            while daemon.running:
+                server.handle_request()
+        finally:
+            os.unlink(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="常驻的提醒音渲染服务，使用行分隔的 JSON 请求")
+    parser.add_argument("--socket", metavar="PATH", help="监听的 Unix 套接字路径，默认使用标准输入输出")
+    parser.add_argument("--cache-size", type=int, default=64, help="LRU 缓存的渲染数量（默认 64）")
+    parser.add_argument("--dir", metavar="DIR", help="format 为 path 时的默认输出目录（默认系统临时目录）")
+    parser.add_argument("--variants", type=int, default=8, help="每个随机化提醒音的变体池大小（默认 8）")
+    parser.add_argument("--no-warm", action="store_true", help="启动时不预先渲染默认参数")
+    args = parser.parse_args(argv)
+
+    daemon = Daemon(args.cache_size, args.dir, args.variants)
+    if not args.no_warm:
+        daemon.warm()
+    if args.socket:
+        print(f"正在监听 {args.socket}", file=sys.stderr)
+        serve_socket(daemon, args.socket)
+    else:
+        daemon.serve(sys.stdin.buffer, sys.stdout.buffer)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
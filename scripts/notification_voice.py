@@ -1,187 +1,286 @@
-import numpy as np
-from scipy.io import wavfile
+import argparse
+import functools
+import hashlib
+import inspect
+import io
+import json
 import os
+import sys
+import threading
 import time
-from scipy import signal
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import synth
+from synth import (
+    DTYPE,
+    PROFILES,
+    REVERBS,
+    BatchMixer,
+    FileWriter,
+    STREAM_BLOCK,
+    Envelope,
+    Filter,
+    MasterRender,
+    Mixer,
+    Note,
+    Partial,
+    StreamFilter,
+    Tolerance,
+    apply_fades,
+    apply_reverb,
+    load_atlas_index,
+    loop_frequency,
+    loop_length,
+    batch_exp_decay,
+    block_ranges,
+    compare_pcm,
+    draft_mode,
+    exp_decay,
+    exp_rise,
+    expand_grid,
+    fused,
+    noise_gain,
+    noise_table,
+    ramp,
+    read_atlas,
+    render_batch,
+    render_notes,
+    seam_jump,
+    sine,
+    summarize,
+    time_axis,
+    to_pcm,
+    tone_peak,
+    trace,
+    wavetable,
+    write_atlas,
+    write_atomic,
+    write_wav_stream,
+)
 
 
-# 确保有一个存在的目录来保存文件
+# 生成的文件保存目录，只在 generate() 写入时创建，导入本模块没有副作用
 output_dir = os.path.join("src-tauri/resources", "notification_sounds")
-os.makedirs(output_dir, exist_ok=True)
 
-def create_clean_bell(filename="clean_bell.wav", duration=0.6):
+SAMPLE_RATE = 44100
+
+# 草稿预览使用的采样率
+DRAFT_RATE = 11025
+
+# 记录每个提醒音输入哈希的清单文件，用于增量生成
+manifest_path = os.path.join(output_dir, ".manifest.json")
+MANIFEST_VERSION = 2
+
+# 所有提醒音 release 版本打包成的单个 PCM 图集，索引写在同目录的 atlas.json
+atlas_path = os.path.join(output_dir, "atlas.pcm")
+
+# 界面绘制波形预览用的峰值摘要和频谱缩略图，与渲染同时计算，不需要重新读取 WAV
+previews_path = os.path.join(output_dir, "previews.json")
+PREVIEWS_VERSION = 1
+
+# 随机化提醒音的预渲染变体池，应用按 index.json 轮换使用，避免每次都听到同一段声音
+variants_dir = os.path.join(output_dir, "variants")
+variants_index_path = os.path.join(variants_dir, "index.json")
+VARIANTS_VERSION = 1
+
+# 可无缝循环的环境音，每个循环旁边有记录循环点的 {名称}.loop.json
+loops_dir = os.path.join(output_dir, "loops")
+
+# 黄金参考输出：所有提醒音以默认参数（固定种子）渲染的 16 位 PCM 图集，随源码一起提交，
+# --verify 把当前渲染结果与之比较，--update-golden 在确认声音的改动是有意的之后重新记录
+golden_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden", "golden.pcm")
+
+# 个别提醒音的回归容差，未列出的使用 Tolerance() 的默认值
+GOLDEN_TOLERANCES = {}
+
+def _write_wav(filepath, sample_rate, samples, writer=None):
+    """把整数 PCM 编码为 WAV 并原子地写入 filepath，writer 不为空时交给其 I/O 线程池"""
+    from scipy.io import wavfile
+
+    buffer = io.BytesIO()
+    wavfile.write(buffer, sample_rate, samples)
+    if writer is not None:
+        writer.submit(filepath, buffer.getvalue())
+    else:
+        write_atomic(filepath, buffer.getvalue())
+    return filepath
+
+def create_clean_bell(duration=0.6, sample_rate=SAMPLE_RATE,
+                      base_freq=1567.98, decay_scale=1.0):
     """创建一个干净清脆的铃声，类似高级手机的提醒音"""
-    filepath = os.path.join(output_dir, filename)
-    sample_rate = 44100
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    
+    mix = Mixer(int(sample_rate * duration), sample_rate)
+
     # 使用明亮的频率
-    freq1 = 1567.98  # G6
-    freq2 = 2349.32  # D7
-    
-    # 基本音调
-    bell = np.sin(2 * np.pi * freq1 * t) * 0.5 + np.sin(2 * np.pi * freq2 * t) * 0.3
-    
-    # 加一点点高频泛音增加清脆感
-    harmonic = np.sin(2 * np.pi * freq1 * 2 * t) * 0.15
-    
-    # 组合并添加指数衰减
-    sound = (bell + harmonic) * np.exp(-t * 8)
-    
-    # 标准化并转换
-    sound = sound / np.max(np.abs(sound)) * 0.9
-    sound_int = np.int16(sound * 32767)
-    
-    wavfile.write(filepath, sample_rate, sound_int)
-    return filepath
+    freq1 = base_freq  # 默认 G6
+    freq2 = base_freq * (2349.32 / 1567.98)  # 默认 D7
+
+    # 基本音调，加一点点高频泛音增加清脆感
+    bell = fused.sine(freq1, 0.5) + fused.sine(freq2, 0.3) + fused.sine(freq1 * 2, 0.15)
+
+    # 组合并添加指数衰减，整个信号图分块一次求值
+    mix.add_expr(bell * fused.exp_decay(8 * decay_scale))
+
+    # 标准化，转换和写入由导出配置完成
+    return mix.normalize(0.9)
+
+def create_clean_bell_batch(duration, base_freq, decay_scale, sample_rate=SAMPLE_RATE):
+    """create_clean_bell 的批量版本：每个参数是长度为变体数的数组，所有变体一次计算
+
+    返回 (二维 int16 数组, 每个变体的采样数)，第 i 行与对应参数的 create_clean_bell 输出一致。
+    """
+    mix = BatchMixer((sample_rate * duration).astype(int), sample_rate)
+
+    freq1 = base_freq
+    freq2 = base_freq * (2349.32 / 1567.98)
 
-def create_warm_notification(filename="warm_notification.wav", duration=0.8):
+    mix.add_sine(freq1, 0.5)
+    mix.add_sine(freq2, 0.3)
+    mix.add_sine(freq1 * 2, 0.15)
+
+    mix.multiply(batch_exp_decay(8 * decay_scale, mix.n, sample_rate, out=mix.scratch(1)))
+
+    return mix.to_int16(0.9)
+
+def create_warm_notification(duration=0.8, sample_rate=SAMPLE_RATE):
     """创建一个温暖舒适的提醒音，适合日常使用"""
-    filepath = os.path.join(output_dir, filename)
-    sample_rate = 44100
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    
+    mix = Mixer(int(sample_rate * duration), sample_rate)
+
     # 使用温暖的大三和弦
     f_base = 392.00  # G4
     f_third = 493.88  # B4
     f_fifth = 587.33  # D5
-    
-    # 主音色
-    tone1 = np.sin(2 * np.pi * f_base * t) * 0.5
-    tone2 = np.sin(2 * np.pi * f_third * t) * 0.4
-    tone3 = np.sin(2 * np.pi * f_fifth * t) * 0.4
-    
-    # 增加一些泛音和质感
-    harmonic1 = np.sin(2 * np.pi * f_base * 2 * t) * 0.2
-    harmonic2 = np.sin(2 * np.pi * f_third * 2 * t) * 0.1
-    
-    # 添加轻微的颤音效果
-    vibrato = np.sin(2 * np.pi * 6 * t) * 0.05
-    tone1 = tone1 * (1 + vibrato)
-    
-    # 混合所有音色
-    tone = tone1 + tone2 + tone3 + harmonic1 + harmonic2
-    
+
+    # 主音色，添加轻微的颤音效果
+    mix.add_expr(fused.sine(f_base, 0.5) * (fused.sine(6, 0.05) + 1))
+
+    # 和弦其余的音加上一些泛音和质感，作为相对 G4 的一组分音一次合成
+    mix.add_partials(f_base, (
+        Partial(f_third / f_base, 0.4),
+        Partial(f_fifth / f_base, 0.4),
+        Partial(2, 0.2),
+        Partial(2 * f_third / f_base, 0.1),
+    ))
+
     # 使用更自然的衰减曲线
-    envelope = np.exp(-t * 4) * (1 - np.exp(-t * 25))
-    
-    sound = tone * envelope
-    
-    # 标准化并转换
-    sound = sound / np.max(np.abs(sound)) * 0.9
-    sound_int = np.int16(sound * 32767)
-    
-    wavfile.write(filepath, sample_rate, sound_int)
-    return filepath
+    mix.multiply_expr(fused.exp_decay(4) * fused.exp_rise(25))
 
-def create_soft_chime(filename="soft_chime.wav", duration=1.2):
+    # 标准化，转换和写入由导出配置完成
+    return mix.normalize(0.9)
+
+def create_soft_chime(duration=1.2, sample_rate=SAMPLE_RATE, seed=0):
     """创建一个柔和的风铃音效，舒缓而不突兀"""
-    filepath = os.path.join(output_dir, filename)
-    sample_rate = 44100
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    
+    mix = Mixer(int(sample_rate * duration), sample_rate)
+    n = mix.n
+
     # 基础音调 - 五声音阶
     freqs = [783.99, 880.00, 987.77, 1174.66, 1318.51]  # G5, A5, B5, D6, E6
-    
-    # 创建基本的风铃声音
-    chime = np.zeros_like(t)
-    for i, freq in enumerate(freqs):
-        # 为每个音调设置稍微不同的起始时间和衰减
-        delay = i * 0.1
-        decay = 2 + i * 0.5
-        
-        # 只有在延迟后才开始这个音符
-        idx = int(delay * sample_rate)
-        if idx < len(t):
-            note_t = t[:len(t)-idx]
-            note = np.sin(2 * np.pi * freq * note_t) * np.exp(-note_t * decay)
-            chime[idx:] += note[:len(t)-idx] * (0.3 - i * 0.05)
-    
+
+    # 创建基本的风铃声音，为每个音调设置稍微不同的起始时间和衰减
+    render_notes(mix, [
+        Note(i * 0.1, freq, Envelope(2 + i * 0.5), gain=0.3 - i * 0.05)
+        for i, freq in enumerate(freqs)
+    ])
+
     # 添加轻微噪音模拟真实风铃
-    noise = np.random.normal(0, 0.01, len(t))
-    noise_filtered = noise * np.exp(-t * 15)
-    
-    sound = chime + noise_filtered
-    
-    # 标准化并转换
-    sound = sound / np.max(np.abs(sound)) * 0.85  # 稍微降低音量使其更柔和
-    sound_int = np.int16(sound * 32767)
-    
-    wavfile.write(filepath, sample_rate, sound_int)
-    return filepath
+    noise = noise_table(n, sample_rate, seed=seed)
+    mix.add_expr(fused.signal(noise) * fused.exp_decay(15), 0.01)
 
-def create_modern_alert(filename="modern_alert.wav", duration=0.5):
+    # 标准化，转换和写入由导出配置完成
+    return mix.normalize(0.85)  # 稍微降低音量使其更柔和
+
+def create_modern_alert(duration=0.5, sample_rate=SAMPLE_RATE):
     """创建一个现代感十足的简短提醒音，类似高端科技产品"""
-    filepath = os.path.join(output_dir, filename)
-    sample_rate = 44100
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    
+    mix = Mixer(int(sample_rate * duration), sample_rate)
+    n = mix.n
+
     # 使用上升的音调
     start_freq = 1000
     end_freq = 1800
-    
-    # 创建一个频率扫描
-    freq = start_freq + (end_freq - start_freq) * (1 - np.exp(-t * 10)) / (1 - np.exp(-duration * 10))
-    phase = 2 * np.pi * np.cumsum(freq) / sample_rate
-    sweep = np.sin(phase)
-    
+
+    # 创建一个频率扫描，相位由振荡器逐块累加
+    freq = exp_rise(10, n, sample_rate, out=mix.scratch(1))
+    np.multiply(freq, (end_freq - start_freq) / (1 - np.exp(-duration * 10)), out=freq)
+    np.add(freq, start_freq, out=freq)
+    mix.add(sine(freq, n, sample_rate, out=mix.scratch(0)))
+
     # 添加一点数字化处理效果
-    digital_effect = np.sin(2 * np.pi * 2200 * t) * np.exp(-t * 30) * 0.2
-    
+    mix.add_expr(fused.sine(2200) * fused.exp_decay(30), 0.2)
+
     # 组合并塑造音量包络
-    envelope = np.exp(-t * 6) * (1 - np.exp(-t * 100))
-    sound = (sweep + digital_effect) * envelope
-    
-    # 标准化并转换
-    sound = sound / np.max(np.abs(sound)) * 0.9
-    sound_int = np.int16(sound * 32767)
-    
-    wavfile.write(filepath, sample_rate, sound_int)
-    return filepath
+    mix.multiply_expr(fused.exp_decay(6) * fused.exp_rise(100))
 
-def create_gentle_ding_dong(filename="gentle_ding_dong.wav", duration=1.0):
+    # 标准化，转换和写入由导出配置完成
+    return mix.normalize(0.9)
+
+def create_gentle_ding_dong(duration=1.0, sample_rate=SAMPLE_RATE,
+                            base_freq=880, decay_scale=1.0):
     """创建一个温和的"叮咚"双音节提醒音"""
-    filepath = os.path.join(output_dir, filename)
-    sample_rate = 44100
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    
+    mix = Mixer(int(sample_rate * duration), sample_rate)
+    n = mix.n
+
     # 叮咚的两个音符
-    ding_freq = 880  # A5
-    dong_freq = 659.25  # E5
-    
+    ding_freq = base_freq  # 默认 A5
+    dong_freq = base_freq * (659.25 / 880)  # 默认 E5
+
     # 创建两个音符，时间上有重叠
-    ding_t = t[:int(sample_rate * 0.6)]
-    dong_t = t[int(sample_rate * 0.3):]
-    
-    ding = np.sin(2 * np.pi * ding_freq * ding_t) * np.exp(-ding_t * 6)
-    ding = np.append(ding, np.zeros(len(t) - len(ding)))
-    
-    dong = np.sin(2 * np.pi * dong_freq * dong_t) * np.exp(-dong_t * 4)
-    dong = np.append(np.zeros(len(t) - len(dong)), dong)[:len(t)]
-    
+    ding_len = min(int(sample_rate * 0.6), n)
+    dong_idx = min(int(sample_rate * 0.3), n)
+    # "咚"沿用整段的时间轴，相位和衰减都从 0.3 秒处接着算
+    dong_start = dong_idx / sample_rate
+
+    mix.add_expr(fused.sine(ding_freq) * fused.exp_decay(6 * decay_scale), length=ding_len)
+    mix.add_expr(fused.sine(dong_freq, phase0=dong_freq * dong_start)
+                 * fused.exp_decay(4 * decay_scale, start=dong_start), offset=dong_idx)
+
     # 添加一些泛音增加音色丰富度
-    ding_harmonic = np.sin(2 * np.pi * ding_freq * 2 * ding_t) * 0.2 * np.exp(-ding_t * 8)
-    ding_harmonic = np.append(ding_harmonic, np.zeros(len(t) - len(ding_harmonic)))
-    
-    dong_harmonic = np.sin(2 * np.pi * dong_freq * 1.5 * dong_t) * 0.3 * np.exp(-dong_t * 5)
-    dong_harmonic = np.append(np.zeros(len(t) - len(dong_harmonic)), dong_harmonic)[:len(t)]
-    
-    # 组合所有声音
-    sound = ding + dong + ding_harmonic + dong_harmonic
-    
-    # 标准化并转换
-    sound = sound / np.max(np.abs(sound)) * 0.9
-    sound_int = np.int16(sound * 32767)
-    
-    wavfile.write(filepath, sample_rate, sound_int)
-    return filepath
+    mix.add_expr(fused.sine(ding_freq * 2) * fused.exp_decay(8 * decay_scale), 0.2, length=ding_len)
+    mix.add_expr(fused.sine(dong_freq * 1.5, phase0=dong_freq * 1.5 * dong_start)
+                 * fused.exp_decay(5 * decay_scale, start=dong_start), 0.3, offset=dong_idx)
+
+    # 标准化，转换和写入由导出配置完成
+    return mix.normalize(0.9)
+
+def create_gentle_ding_dong_batch(duration, base_freq, decay_scale, sample_rate=SAMPLE_RATE):
+    """create_gentle_ding_dong 的批量版本：每个参数是长度为变体数的数组，所有变体一次计算
+
+    "叮"和"咚"的起止时间不随时长变化，较短变体超出自身长度的部分在标准化前被清零，
+    因此第 i 行与对应参数的 create_gentle_ding_dong 输出一致。
+    """
+    mix = BatchMixer((sample_rate * duration).astype(int), sample_rate)
+    n = mix.n
+
+    ding_freq = base_freq
+    dong_freq = base_freq * (659.25 / 880)
+
+    ding_len = min(int(sample_rate * 0.6), n)
+    dong_idx = min(int(sample_rate * 0.3), n)
+    dong_len = n - dong_idx
+    dong_start = dong_idx / sample_rate
+
+    ding_env = batch_exp_decay(6 * decay_scale, ding_len, sample_rate, out=mix.scratch(1, ding_len))
+    mix.add_sine(ding_freq, length=ding_len, envelope=ding_env)
 
-def create_uplifting_notification(filename="uplifting_notification.wav", duration=1.5):
+    dong_env = batch_exp_decay(4 * decay_scale, dong_len, sample_rate, out=mix.scratch(1, dong_len),
+                               start=dong_start)
+    mix.add_sine(dong_freq, offset=dong_idx, envelope=dong_env, phase0=dong_freq * dong_start)
+
+    ding_env = batch_exp_decay(8 * decay_scale, ding_len, sample_rate, out=mix.scratch(1, ding_len))
+    mix.add_sine(ding_freq * 2, 0.2, length=ding_len, envelope=ding_env)
+
+    dong_env = batch_exp_decay(5 * decay_scale, dong_len, sample_rate, out=mix.scratch(1, dong_len),
+                               start=dong_start)
+    mix.add_sine(dong_freq * 1.5, 0.3, offset=dong_idx, envelope=dong_env,
+                 phase0=dong_freq * 1.5 * dong_start)
+
+    return mix.to_int16(0.9)
+
+def create_uplifting_notification(duration=1.5, sample_rate=SAMPLE_RATE):
     """创建一个振奋人心的上升音效，适合激励和积极的提醒"""
-    filepath = os.path.join(output_dir, filename)
-    sample_rate = 44100
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    
+    mix = Mixer(int(sample_rate * duration), sample_rate)
+    n = mix.n
+
     # 使用上升的和弦进行
     # 开始是C大调，结束是明亮的E大调
     chord_progression = [
@@ -189,386 +288,361 @@ def create_uplifting_notification(filename="uplifting_notification.wav", duratio
         [293.66, 369.99, 440.00],  # D 大三和弦
         [329.63, 415.30, 493.88]   # E 大三和弦
     ]
-    
-    sound = np.zeros_like(t)
-    
+
     # 为每个和弦创建一个音段
     segment_duration = duration / len(chord_progression)
     for i, chord in enumerate(chord_progression):
         segment_start = int(i * segment_duration * sample_rate)
         segment_end = int((i + 1) * segment_duration * sample_rate)
-        if segment_end > len(t):
-            segment_end = len(t)
-            
-        segment_t = t[segment_start:segment_end] - t[segment_start]
-        segment = np.zeros_like(segment_t)
-        
-        # 创建和弦
-        for freq in chord:
-            note = np.sin(2 * np.pi * freq * segment_t)
-            # 添加明亮的泛音
-            harmonic = np.sin(2 * np.pi * freq * 2 * segment_t) * 0.3
-            segment += note + harmonic
-            
+        if segment_end > n:
+            segment_end = n
+        length = segment_end - segment_start
+
+        # 创建和弦，每个音加上明亮的二次泛音，作为相对根音的一组分音一次合成；
+        # 音段之间互不重叠，直接写入混音缓冲区
+        root = chord[0]
+        timbre = tuple(Partial(freq / root * k, amp) for freq in chord for k, amp in ((1, 1.0), (2, 0.3)))
+        mix.add_partials(root, timbre, offset=segment_start, length=length)
+
         # 每个和弦有渐强效果
-        envelope = np.linspace(0.5, 1.0, len(segment_t))
+        envelope = ramp(0.5, 1.0, length, out=mix.scratch(1, length))
         if i == len(chord_progression) - 1:  # 最后一个和弦有衰减
-            decay = np.exp(-(segment_t - segment_duration) * 8)
-            envelope = envelope * decay
-            
-        sound[segment_start:segment_end] = segment * envelope
-    
+            decay = exp_decay(8, length, sample_rate, out=mix.scratch(2, length), start=-segment_duration)
+            np.multiply(envelope, decay, out=envelope)
+
+        mix.multiply(envelope, offset=segment_start)
+
     # 添加明亮的高频点缀，增强振奋感
     sparkle_freq = 1200
-    sparkle = np.sin(2 * np.pi * sparkle_freq * t) * np.exp(-t * 6) * 0.15
-    
-    # 组合所有元素
-    sound = sound + sparkle
-    
-    # 标准化并转换
-    sound = sound / np.max(np.abs(sound)) * 0.9
-    sound_int = np.int16(sound * 32767)
-    
-    wavfile.write(filepath, sample_rate, sound_int)
-    return filepath
+    mix.add_expr(fused.sine(sparkle_freq) * fused.exp_decay(6), 0.15)
+
+    # 标准化，转换和写入由导出配置完成
+    return mix.normalize(0.9)
+
+def create_calming_waves(duration=3.0, sample_rate=SAMPLE_RATE, seed=0, loop=False):
+    """创建一个镇静舒缓的海浪般音效，帮助放松心情
+
+    loop 为真时生成可无缝循环的版本：时长取整数个调制周期，音调微调为循环内整数个周期，
+    不加渐入渐出（噪声表本身以整段为周期）。
+    """
+    mod_freq = 0.5  # 半赫兹的调制
+    mix = Mixer(loop_length(duration, mod_freq, sample_rate) if loop else int(sample_rate * duration), sample_rate)
+    n = mix.n
 
-def create_calming_waves(filename="calming_waves.wav", duration=3.0):
-    """创建一个镇静舒缓的海浪般音效，帮助放松心情"""
-    filepath = os.path.join(output_dir, filename)
-    sample_rate = 44100
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    
     # 创建基础的平静音调
     f_base = 174.61  # F3，低沉的音调
     f_fifth = 261.63  # C4，完美五度
-    
-    # 创建缓慢起伏的调制
-    mod_freq = 0.5  # 半赫兹的调制，像海浪
-    modulation = 0.5 + 0.5 * np.sin(2 * np.pi * mod_freq * t)
-    
+    if loop:
+        f_base, f_fifth = (loop_frequency(f, n, sample_rate) for f in (f_base, f_fifth))
+
     # 基础音调
-    base = np.sin(2 * np.pi * f_base * t) * 0.5
-    fifth = np.sin(2 * np.pi * f_fifth * t) * 0.3
-    
-    # 添加轻微的调制
-    base = base * modulation
-    fifth = fifth * modulation
-    
-    # 添加柔和的白噪声模拟海浪声
-    noise = np.random.normal(0, 0.1, len(t))
-    # 用带通滤波器过滤白噪声
-    b, a = signal.butter(3, [0.1, 0.3], 'band')
-    filtered_noise = signal.filtfilt(b, a, noise)
-    filtered_noise = filtered_noise * modulation * 0.4
-    
-    # 混合声音
-    sound = base + fifth + filtered_noise
-    
+    mix.add_sine(f_base, 0.5)
+    mix.add_sine(f_fifth, 0.3)
+
+    # 添加柔和的带通噪声模拟海浪声，频谱与零相位带通滤波后的白噪声相同，直接在频域合成并缓存
+    # 通带为 0.1~0.3 倍奈奎斯特频率（44.1 kHz 下 2205~6615 Hz）
+    noise = noise_table(n, sample_rate, band=Filter(3, (2205.0, 6615.0), "bandpass"), seed=seed)
+    mix.add_expr(fused.signal(noise), 0.1 * 0.4)
+
+    # 创建缓慢起伏的调制，像海浪，同时作用于音调和噪声
+    mix.multiply_expr(fused.sine(mod_freq, 0.5) + 0.5)
+
     # 添加渐入渐出效果
-    fade_time = 0.5  # 秒
-    fade_samples = int(fade_time * sample_rate)
-    fade_in = np.linspace(0, 1, fade_samples)
-    fade_out = np.linspace(1, 0, fade_samples)
-    
-    sound[:fade_samples] = sound[:fade_samples] * fade_in
-    sound[-fade_samples:] = sound[-fade_samples:] * fade_out
-    
-    # 标准化并转换
-    sound = sound / np.max(np.abs(sound)) * 0.9
-    sound_int = np.int16(sound * 32767)
-    
-    wavfile.write(filepath, sample_rate, sound_int)
-    return filepath
+    if not loop:
+        fade_time = 0.5  # 秒
+        fade_samples = int(fade_time * sample_rate)
+        mix.multiply(ramp(0, 1, fade_samples, out=mix.scratch(1, fade_samples)))
+        mix.multiply(ramp(1, 0, fade_samples, out=mix.scratch(1, fade_samples)), offset=n - fade_samples)
 
-def create_energetic_alert(filename="energetic_alert.wav", duration=1.2):
+    # 标准化，转换和写入由导出配置完成
+    return mix.normalize(0.9)
+
+def create_energetic_alert(duration=1.2, sample_rate=SAMPLE_RATE):
     """创建一个充满活力的提醒音，让人兴奋并准备行动"""
-    filepath = os.path.join(output_dir, filename)
-    sample_rate = 44100
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    
+    mix = Mixer(int(sample_rate * duration), sample_rate)
+    n = mix.n
+
     # 创建一个有节奏感的提醒
-    rhythm_pattern = np.zeros_like(t)
     beat_points = [0.0, 0.2, 0.4, 0.5, 0.6, 0.7, 0.8]
-    
+
+    beats = []
     for beat in beat_points:
-        idx = int(beat * sample_rate)
-        if idx < len(t):
-            # 创建一个短促的打击音
-            beat_env = np.exp(-(t[idx:] - t[idx]) * 30)
-            beat_sound = np.sin(2 * np.pi * 880 * t[idx:]) * beat_env
-            
-            # 根据节拍位置调整音高
-            if beat in [0.0, 0.4, 0.8]:  # 主要节拍用高音
-                freq = 880  # A5
-            else:  # 次要节拍用较低的音
-                freq = 659.25  # E5
-                
-            beat_sound = np.sin(2 * np.pi * freq * t[idx:]) * beat_env
-            rhythm_pattern[idx:] += beat_sound[:len(t)-idx] * 0.5
-    
+        # 根据节拍位置调整音高
+        if beat in [0.0, 0.4, 0.8]:  # 主要节拍用高音
+            freq = 880  # A5
+        else:  # 次要节拍用较低的音
+            freq = 659.25  # E5
+
+        # 创建一个短促的打击音，相位沿用整段的时间轴
+        beats.append(Note(beat, freq, Envelope(30), gain=0.5, absolute_phase=True))
+    render_notes(mix, beats)
+
     # 添加上升的背景音，增加兴奋感
     sweep_start = 400
     sweep_end = 800
-    sweep_freq = sweep_start + (sweep_end - sweep_start) * t / duration
-    sweep_phase = 2 * np.pi * np.cumsum(sweep_freq) / sample_rate
-    background_sweep = np.sin(sweep_phase) * 0.3
-    
+    sweep_freq = time_axis(n, sample_rate, out=mix.scratch(1))
+    np.multiply(sweep_freq, (sweep_end - sweep_start) / duration, out=sweep_freq)
+    np.add(sweep_freq, sweep_start, out=sweep_freq)
+    mix.add(sine(sweep_freq, n, sample_rate, out=mix.scratch(0)), 0.3)
+
     # 添加一些明亮的高频泛音增强活力
-    sparkles = np.sin(2 * np.pi * 1200 * t) * np.exp(-t * 5) * 0.2
-    sparkles += np.sin(2 * np.pi * 1500 * t) * np.exp(-t * 6) * 0.15
-    
-    # 组合所有元素
-    sound = rhythm_pattern + background_sweep + sparkles
-    
+    mix.add_expr(fused.sine(1200) * fused.exp_decay(5), 0.2)
+    mix.add_expr(fused.sine(1500) * fused.exp_decay(6), 0.15)
+
     # 添加整体音量包络
-    envelope = 1.0 - 0.7 * np.exp(-t * 1.5)
-    envelope = envelope * np.exp(-(t-duration+0.3) * 4)
-    sound = sound * envelope
-    
-    # 标准化并转换
-    sound = sound / np.max(np.abs(sound)) * 0.9
-    sound_int = np.int16(sound * 32767)
-    
-    wavfile.write(filepath, sample_rate, sound_int)
-    return filepath
+    mix.multiply_expr((fused.exp_decay(1.5) * -0.7 + 1.0) * fused.exp_decay(4, start=-duration + 0.3))
 
-def create_peaceful_chimes(filename="peaceful_chimes.wav", duration=2.5):
+    # 标准化，转换和写入由导出配置完成
+    return mix.normalize(0.9)
+
+def create_peaceful_chimes(duration=2.5, sample_rate=SAMPLE_RATE, seed=0):
     """创建一个平和宁静的风铃音效，给人一种平静祥和的感觉"""
-    filepath = os.path.join(output_dir, filename)
-    sample_rate = 44100
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    
+    rng = np.random.default_rng(seed)
+    mix = Mixer(int(sample_rate * duration), sample_rate)
+
     # 使用五声音阶中的音符 (中国传统五声音阶: 宫商角徵羽)
     pentatonic_freqs = [523.25, 587.33, 659.25, 783.99, 880.00]  # C5, D5, E5, G5, A5
-    
-    sound = np.zeros_like(t)
-    
+
+    # 基音加两个衰减更快的泛音
+    chime_timbre = (Partial(1), Partial(2, 0.2, 1), Partial(3, 0.1, 2))
+
     # 随机时间点触发不同的音符
+    notes = []
     for i in range(12):
         # 随机选择一个音符和时间点
-        freq = np.random.choice(pentatonic_freqs)
-        time_point = np.random.uniform(0, duration * 0.8)
-        idx = int(time_point * sample_rate)
-        
-        if idx < len(t):
-            # 创建衰减音符
-            note_t = t[idx:] - t[idx]
-            decay = 2 + np.random.uniform(0, 2)  # 随机衰减率增加自然感
-            note = np.sin(2 * np.pi * freq * note_t) * np.exp(-note_t * decay)
-            
-            # 添加泛音
-            harmonic1 = np.sin(2 * np.pi * freq * 2 * note_t) * 0.2 * np.exp(-note_t * (decay+1))
-            harmonic2 = np.sin(2 * np.pi * freq * 3 * note_t) * 0.1 * np.exp(-note_t * (decay+2))
-            
-            # 组合音符和泛音
-            full_note = note + harmonic1 + harmonic2
-            
-            # 添加到总声音
-            sound[idx:] += full_note[:len(t)-idx] * 0.25
-    
+        freq = rng.choice(pentatonic_freqs)
+        time_point = rng.uniform(0, duration * 0.8)
+
+        # 创建衰减音符
+        decay = 2 + rng.uniform(0, 2)  # 随机衰减率增加自然感
+        notes.append(Note(time_point, freq, Envelope(decay), chime_timbre, gain=0.25))
+    render_notes(mix, notes)
+
     # 添加柔和的背景音
     bg_freq = 196.00  # G3
-    background = np.sin(2 * np.pi * bg_freq * t) * 0.1
-    background = background * np.exp(-t * 1.5)
-    
-    # 组合所有元素
-    sound = sound + background
-    
-    # 标准化并转换
-    sound = sound / np.max(np.abs(sound)) * 0.85  # 稍微降低音量使其更柔和
-    sound_int = np.int16(sound * 32767)
-    
-    wavfile.write(filepath, sample_rate, sound_int)
-    return filepath
+    mix.add_expr(fused.sine(bg_freq) * fused.exp_decay(1.5), 0.1)
+
+    # 标准化，转换和写入由导出配置完成
+    return mix.normalize(0.85)  # 稍微降低音量使其更柔和
 
-def create_motivational_flourish(filename="motivational_flourish.wav", duration=2.0):
+def create_motivational_flourish(duration=2.0, sample_rate=SAMPLE_RATE):
     """创建一个鼓舞人心的音乐性提醒，适合完成任务后的庆祝"""
-    filepath = os.path.join(output_dir, filename)
-    sample_rate = 44100
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    
+    mix = Mixer(int(sample_rate * duration), sample_rate)
+
     # 创建一个上升的音阶
     scale_notes = [392.00, 440.00, 493.88, 523.25, 587.33, 659.25, 783.99]  # G4 到 G5 的大调音阶
-    
-    sound = np.zeros_like(t)
+
     note_duration = duration / (len(scale_notes) + 2)  # 留一些时间给最后的和弦
-    
-    # 演奏上升的音阶
-    for i, freq in enumerate(scale_notes):
-        start_idx = int(i * note_duration * sample_rate)
-        if start_idx < len(t):
-            # 每个音符持续时间
-            note_t = t[start_idx:] - t[start_idx]
-            note_env = np.exp(-note_t * 8)  # 快速衰减
-            note = np.sin(2 * np.pi * freq * note_t) * note_env
-            
-            # 添加泛音增强明亮感
-            harmonic = np.sin(2 * np.pi * freq * 2 * note_t) * 0.3 * note_env
-            
-            # 加到总声音
-            max_len = min(len(note), len(t)-start_idx)
-            sound[start_idx:start_idx+max_len] += (note + harmonic)[:max_len] * 0.3
-    
-    # 最后添加一个明亮的和弦作为结束
-    chord_start = int((len(scale_notes) - 1) * note_duration * sample_rate)
-    if chord_start < len(t):
-        chord_t = t[chord_start:] - t[chord_start]
-        
-        # 创建一个明亮的大三和弦
-        root = scale_notes[-1]  # G5
-        third = root * 5/4  # B5
-        fifth = root * 3/2  # D6
-        
-        chord = (np.sin(2 * np.pi * root * chord_t) * 0.5 + 
-                np.sin(2 * np.pi * third * chord_t) * 0.4 + 
-                np.sin(2 * np.pi * fifth * chord_t) * 0.4)
-        
-        # 添加延音效果
-        chord_env = np.exp(-chord_t * 2)
-        
-        # 加到总声音
-        max_len = min(len(chord), len(t)-chord_start)
-        sound[chord_start:chord_start+max_len] += (chord * chord_env)[:max_len] * 0.6
-    
+
+    # 演奏上升的音阶，快速衰减，并添加泛音增强明亮感
+    note_timbre = (Partial(1), Partial(2, 0.3))
+    notes = [
+        Note(i * note_duration, freq, Envelope(8), note_timbre, gain=0.3)
+        for i, freq in enumerate(scale_notes)
+    ]
+
+    # 最后添加一个明亮的大三和弦作为结束：G5、B5、D6，带延音效果
+    root = scale_notes[-1]  # G5
+    chord_timbre = (Partial(1, 0.5), Partial(5/4, 0.4), Partial(3/2, 0.4))
+    notes.append(Note((len(scale_notes) - 1) * note_duration, root, Envelope(2), chord_timbre, gain=0.6))
+    render_notes(mix, notes)
+
     # 添加整体音量包络
-    envelope = np.ones_like(t)
-    fade_out = np.exp(-(t-duration+0.4) * 5)
-    envelope = envelope * fade_out
-    sound = sound * envelope
-    
-    # 标准化并转换
-    sound = sound / np.max(np.abs(sound)) * 0.9
-    sound_int = np.int16(sound * 32767)
-    
-    wavfile.write(filepath, sample_rate, sound_int)
-    return filepath
+    mix.multiply_expr(fused.exp_decay(5, start=-duration + 0.4))
+
+    # 标准化，转换和写入由导出配置完成
+    return mix.normalize(0.9)
+
+def create_focus_pulse(duration=2.0, sample_rate=SAMPLE_RATE, seed=0, loop=False):
+    """创建一个有助于集中注意力的脉冲音效，适合工作和学习环境
+
+    loop 为真时生成可无缝循环的版本（见 create_calming_waves）。
+    """
+    pulse_rate = 4  # Hz
+    mix = Mixer(loop_length(duration, pulse_rate, sample_rate) if loop else int(sample_rate * duration), sample_rate)
+    n = mix.n
 
-def create_focus_pulse(filename="focus_pulse.wav", duration=2.0):
-    """创建一个有助于集中注意力的脉冲音效，适合工作和学习环境"""
-    filepath = os.path.join(output_dir, filename)
-    sample_rate = 44100
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    
     # 创建一个缓慢脉动的基础音调
     base_freq = 220.00  # A3
-    pulse_rate = 4  # Hz
-    
-    # 脉冲包络
-    pulse_env = 0.5 + 0.5 * np.sin(2 * np.pi * pulse_rate * t)
-    pulse_env = pulse_env ** 2  # 使脉冲形状更加尖锐
-    
-    # 主音调
-    base_tone = np.sin(2 * np.pi * base_freq * t) * 0.4
-    fifth_tone = np.sin(2 * np.pi * base_freq * 1.5 * t) * 0.3  # 完美五度
-    
-    # 应用脉冲调制
-    modulated_tone = (base_tone + fifth_tone) * pulse_env
-    
+    tones = [base_freq, base_freq * 1.5, base_freq * 4]
+    if loop:
+        tones = [loop_frequency(f, n, sample_rate) for f in tones]
+
+    # 主音调，第二个为完美五度
+    mix.add_sine(tones[0], 0.4)
+    mix.add_sine(tones[1], 0.3)
+
     # 添加高频组件增强清晰度
-    high_tone = np.sin(2 * np.pi * base_freq * 4 * t) * 0.1
-    high_tone = high_tone * pulse_env
-    
-    # 添加微妙的噪声增加深度
-    noise = np.random.normal(0, 0.05, len(t))
-    b, a = signal.butter(3, 0.1, 'low')
-    filtered_noise = signal.filtfilt(b, a, noise)
-    filtered_noise = filtered_noise * pulse_env * 0.2
-    
-    # 组合所有声音
-    sound = modulated_tone + high_tone + filtered_noise
-    
+    mix.add_sine(tones[2], 0.1)
+
+    # 添加微妙的低通噪声增加深度，截止频率为 0.1 倍奈奎斯特频率（44.1 kHz 下 2205 Hz）
+    noise = noise_table(n, sample_rate, band=Filter(3, 2205.0, "lowpass"), seed=seed)
+    mix.add_expr(fused.signal(noise), 0.05 * 0.2)
+
+    # 脉冲包络同时调制音调和噪声
+    # 平方使脉冲形状更加尖锐
+    mix.multiply_expr(fused.square(fused.sine(pulse_rate, 0.5) + 0.5))
+
     # 添加渐入渐出
-    fade_in = np.linspace(0, 1, int(0.1 * sample_rate))
-    fade_out = np.linspace(1, 0, int(0.3 * sample_rate))
-    
-    if len(fade_in) < len(sound):
-        sound[:len(fade_in)] *= fade_in
-    if len(fade_out) < len(sound):
-        sound[-len(fade_out):] *= fade_out
-    
-    # 标准化并转换
-    sound = sound / np.max(np.abs(sound)) * 0.85
-    sound_int = np.int16(sound * 32767)
-    
-    wavfile.write(filepath, sample_rate, sound_int)
-    return filepath
+    if not loop:
+        fade_in_len = int(0.1 * sample_rate)
+        fade_out_len = int(0.3 * sample_rate)
+
+        if fade_in_len < n:
+            mix.multiply(ramp(0, 1, fade_in_len, out=mix.scratch(1, fade_in_len)))
+        if fade_out_len < n:
+            mix.multiply(ramp(1, 0, fade_out_len, out=mix.scratch(1, fade_out_len)), offset=n - fade_out_len)
+
+    # 标准化，转换和写入由导出配置完成
+    return mix.normalize(0.85)
+
+def stream_calming_waves(duration=3600.0, sample_rate=SAMPLE_RATE, seed=0, block_size=STREAM_BLOCK):
+    """按块流式生成任意时长的海浪音效，产出已乘以预计算增益的 float32 块
+
+    与 create_calming_waves 使用相同的音调、调制和渐入渐出，但噪声使用带状态的因果滤波，
+    不需要整段缓冲区，也不需要 np.max 标准化。产出的块在下一次迭代时会被复用。
+    """
+    rng = np.random.default_rng(seed)
+    n = int(sample_rate * duration)
+
+    f_base = 174.61  # F3
+    f_fifth = 261.63  # C4
+    mod_freq = 0.5
+
+    # filtfilt 的幅频响应是 |H|²，同一个滤波器因果地串联两次得到相同的噪声频谱
+    sos = Filter(3, (2205.0, 6615.0), "bandpass").sos(sample_rate)
+    sos = np.vstack([sos, sos])
+    noise_filter = StreamFilter(sos)
+    noise_sigma = 0.1 * 0.4 * noise_gain(sos)
+
+    # 预先计算增益：音调叠加的峰值加上噪声的 6σ，极少数超出的采样在写入时削波
+    gain = 0.9 / (tone_peak([(f_base, 0.5), (f_fifth, 0.3)], sample_rate) + 6 * noise_sigma)
+    fade_samples = int(0.5 * sample_rate)
+
+    block = np.empty(block_size, dtype=DTYPE)
+    scratch = np.empty(block_size, dtype=DTYPE)
+    for start, length in block_ranges(n, block_size):
+        out = block[:length]
+        tmp = scratch[:length]
+        sine(f_base, length, sample_rate, out=out, amp=0.5, phase0=f_base * start / sample_rate)
+        np.add(out, sine(f_fifth, length, sample_rate, out=tmp, amp=0.3,
+                         phase0=f_fifth * start / sample_rate), out=out)
+
+        noise = rng.standard_normal(length, dtype=np.float32, out=tmp)
+        filtered_noise = noise_filter(noise)
+        np.multiply(filtered_noise, 0.1 * 0.4, out=filtered_noise)
+        np.add(out, filtered_noise, out=out)
+
+        modulation = sine(mod_freq, length, sample_rate, out=tmp, amp=0.5,
+                          phase0=mod_freq * start / sample_rate)
+        np.add(modulation, 0.5, out=modulation)
+        np.multiply(out, modulation, out=out)
+
+        apply_fades(out, start, n, fade_samples, fade_samples, scratch=scratch)
+        np.multiply(out, gain, out=out)
+        yield out
+
+def stream_focus_pulse(duration=3600.0, sample_rate=SAMPLE_RATE, seed=0, block_size=STREAM_BLOCK):
+    """按块流式生成任意时长的专注脉冲音效，产出已乘以预计算增益的 float32 块
+
+    与 create_focus_pulse 使用相同的音调、脉冲包络和渐入渐出，产出的块在下一次迭代时会被复用。
+    """
+    rng = np.random.default_rng(seed)
+    n = int(sample_rate * duration)
+
+    base_freq = 220.00  # A3
+    pulse_rate = 4  # Hz
+    partials = [(1, 0.4), (1.5, 0.3), (4, 0.1)]  # 主音、完美五度、高频组件
+
+    sos = Filter(3, 2205.0, "lowpass").sos(sample_rate)
+    sos = np.vstack([sos, sos])
+    noise_filter = StreamFilter(sos)
+    noise_sigma = 0.05 * 0.2 * noise_gain(sos)
 
-def create_gentle_awakening(filename="gentle_awakening.wav", duration=3.5):
+    # 脉冲包络的最大值为 1
+    peak = tone_peak([(base_freq * ratio, amp) for ratio, amp in partials], sample_rate)
+    gain = 0.85 / (peak + 6 * noise_sigma)
+    fade_in_len = int(0.1 * sample_rate)
+    fade_out_len = int(0.3 * sample_rate)
+
+    block = np.empty(block_size, dtype=DTYPE)
+    scratch = np.empty(block_size, dtype=DTYPE)
+    for start, length in block_ranges(n, block_size):
+        out = block[:length]
+        tmp = scratch[:length]
+        out.fill(0)
+        for ratio, amp in partials:
+            freq = base_freq * ratio
+            np.add(out, sine(freq, length, sample_rate, out=tmp, amp=amp,
+                             phase0=freq * start / sample_rate), out=out)
+
+        noise = rng.standard_normal(length, dtype=np.float32, out=tmp)
+        filtered_noise = noise_filter(noise)
+        np.multiply(filtered_noise, 0.05 * 0.2, out=filtered_noise)
+        np.add(out, filtered_noise, out=out)
+
+        pulse_env = sine(pulse_rate, length, sample_rate, out=tmp, amp=0.5,
+                         phase0=pulse_rate * start / sample_rate)
+        np.add(pulse_env, 0.5, out=pulse_env)
+        np.square(pulse_env, out=pulse_env)
+        np.multiply(out, pulse_env, out=out)
+
+        apply_fades(out, start, n, fade_in_len, fade_out_len, scratch=scratch)
+        np.multiply(out, gain, out=out)
+        yield out
+
+def create_gentle_awakening(duration=3.5, sample_rate=SAMPLE_RATE):
     """创建一个柔和的唤醒音效，适合闹钟或冥想结束提醒"""
-    filepath = os.path.join(output_dir, filename)
-    sample_rate = 44100
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    
+    mix = Mixer(int(sample_rate * duration), sample_rate)
+    n = mix.n
+
     # 基于自然音调的和声
     f1 = 261.63  # C4
     f2 = 329.63  # E4
     f3 = 392.00  # G4
     f4 = 523.25  # C5
-    
+
     # 创建缓慢的颤音效果
     vibrato_rate = 5
     vibrato_depth = 0.007
-    vibrato = np.sin(2 * np.pi * vibrato_rate * t) * vibrato_depth
-    
+    vibrato = sine(vibrato_rate, n, sample_rate, out=mix.scratch(2), amp=vibrato_depth)
+    np.add(vibrato, 1, out=vibrato)
+
     # 创建主要音调，逐渐加入不同的音符
-    phases = []
+    fade_in_len = int(0.8 * sample_rate)
     for i, f in enumerate([f1, f2, f3, f4]):
         # 每个音符在不同时间点淡入
         delay = i * 0.6
         idx = int(delay * sample_rate)
-        if idx < len(t):
-            # 应用颤音
-            f_vibrato = f * (1 + vibrato)
-            # 累积相位确保连续性
-            phase_t = np.zeros_like(t)
-            phase_t[idx:] = t[idx:] - t[idx]
-            phase = 2 * np.pi * f_vibrato * phase_t
-            
+        if idx + fade_in_len < n:
+            length = n - idx
+            # 应用颤音，由相位累加器逐采样累积相位确保连续性
+            f_vibrato = mix.scratch(1, length)
+            np.multiply(vibrato[idx:], f, out=f_vibrato)
+            tone = sine(f_vibrato, length, sample_rate, out=mix.scratch(0, length))
+
             # 应用淡入
-            fade_in_len = int(0.8 * sample_rate)
-            env = np.zeros_like(t)
-            if idx + fade_in_len < len(t):
-                env[idx:idx+fade_in_len] = np.linspace(0, 1, fade_in_len)
-                env[idx+fade_in_len:] = 1
-                
-                phases.append((phase, env, 0.3 - i * 0.05))
-    
-    # 组合所有相位
-    sound = np.zeros_like(t)
-    for phase, env, amp in phases:
-        sound += np.sin(phase) * env * amp
-    
-    # 添加轻微的合成风铃声
-    for i in range(5):
-        time_point = duration * 0.5 + i * 0.3
-        if time_point < duration:
-            idx = int(time_point * sample_rate)
-            note_freq = f4 * (1 + i * 0.2)  # 越来越高的音符
-            note_t = t[idx:] - t[idx]
-            note_env = np.exp(-note_t * 4)
-            note = np.sin(2 * np.pi * note_freq * note_t) * note_env * 0.15
-            
-            if idx < len(sound):
-                max_len = min(len(note), len(sound) - idx)
-                sound[idx:idx+max_len] += note[:max_len]
-    
+            fade_in = ramp(0, 1, fade_in_len, out=mix.scratch(1, fade_in_len))
+            np.multiply(tone[:fade_in_len], fade_in, out=tone[:fade_in_len])
+            mix.add(tone, 0.3 - i * 0.05, offset=idx)
+
+    # 添加轻微的合成风铃声，越来越高的音符
+    render_notes(mix, [
+        Note(duration * 0.5 + i * 0.3, f4 * (1 + i * 0.2), Envelope(4), gain=0.15)
+        for i in range(5)
+    ])
+
     # 应用主包络
-    main_env = np.exp(-(t-duration+0.8) * 3)  # 最后有一个缓慢的淡出
-    sound = sound * main_env
-    
-    # 标准化并转换
-    sound = sound / np.max(np.abs(sound)) * 0.9
-    sound_int = np.int16(sound * 32767)
-    
-    wavfile.write(filepath, sample_rate, sound_int)
-    return filepath
+    mix.multiply_expr(fused.exp_decay(3, start=-duration + 0.8))  # 最后有一个缓慢的淡出
 
-def create_achievement_fanfare(filename="achievement_fanfare.wav", duration=2.2):
+    # 标准化，转换和写入由导出配置完成
+    return mix.normalize(0.9)
+
+def create_achievement_fanfare(duration=2.2, sample_rate=SAMPLE_RATE):
     """创建一个庆祝成就的欢快号角音效，适合完成重要任务时的提醒"""
-    filepath = os.path.join(output_dir, filename)
-    sample_rate = 44100
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    
+    mix = Mixer(int(sample_rate * duration), sample_rate)
+    n = mix.n
+
     # 设计一个欢快的号角主题
     # 主旋律基于大三和弦的分解和装饰
     melody_notes = [
@@ -579,86 +653,734 @@ def create_achievement_fanfare(filename="achievement_fanfare.wav", duration=2.2)
         (1.4, 659.25, 0.25),  # E5
         (1.65, 739.99, 0.55)  # F#5
     ]
-    
-    sound = np.zeros_like(t)
-    
+
+    timbre = (("square", 0.3), ("triangle", 0.3), ("sine", 0.2))
+
     # 创建每个音符
     for start_time, freq, note_duration in melody_notes:
         idx = int(start_time * sample_rate)
         end_idx = int((start_time + note_duration) * sample_rate)
-        
-        if idx < len(t) and end_idx <= len(t):
-            note_t = t[idx:end_idx] - t[idx]
-            
-            # 创建号角音色（使用方波和三角波的混合）
-            square = np.sign(np.sin(2 * np.pi * freq * note_t)) * 0.3
-            triangle = 2 * np.abs(2 * (note_t * freq - np.floor(note_t * freq + 0.5))) - 1
-            triangle = triangle * 0.3
-            
+
+        if idx < n and end_idx <= n:
+            length = end_idx - idx
+            part = mix.scratch(2, length)
+
+            # 创建号角音色（方波和三角波的混合，再加上基频正弦），
+            # 三者相位相同，合成为一张带限波表一次查表得到，不会产生混叠
+            note_sound = wavetable(timbre, freq, length, sample_rate, out=mix.scratch(1, length))
+
             # 添加一些泛音
-            sine = np.sin(2 * np.pi * freq * note_t) * 0.2
-            harmonic = np.sin(2 * np.pi * freq * 1.5 * note_t) * 0.15
-            
-            # 组合音色
-            note_sound = square + triangle + sine + harmonic
-            
+            np.add(note_sound, sine(freq * 1.5, length, sample_rate, out=part, amp=0.15), out=note_sound)
+
             # 应用包络
             attack = 0.1
             decay = 0.2
             attack_samples = int(attack * sample_rate)
             decay_samples = int(decay * sample_rate)
-            
-            env = np.ones_like(note_t)
-            if attack_samples < len(note_t):
-                env[:attack_samples] = np.linspace(0, 1, attack_samples)
-            if decay_samples < len(note_t):
-                env[-decay_samples:] = np.linspace(1, 0.7, decay_samples)
-            
+
+            env = mix.scratch(0, length)
+            env.fill(1)
+            if attack_samples < length:
+                ramp(0, 1, attack_samples, out=env[:attack_samples])
+            if decay_samples < length:
+                ramp(1, 0.7, decay_samples, out=env[-decay_samples:])
+
             # 应用振动效果
             vibrato_rate = 6
             vibrato_depth = 0.03
-            vibrato = 1 + vibrato_depth * np.sin(2 * np.pi * vibrato_rate * note_t)
-            
-            # 最终音符声音
-            final_note = note_sound * env * vibrato
-            
-            # 添加到总音效
-            sound[idx:end_idx] += final_note
-    
+            vibrato = sine(vibrato_rate, length, sample_rate, out=part, amp=vibrato_depth)
+            np.add(vibrato, 1, out=vibrato)
+            np.multiply(env, vibrato, out=env)
+
+            # 最终音符声音，添加到总音效
+            np.multiply(note_sound, env, out=note_sound)
+            mix.add(note_sound, offset=idx)
+
     # 添加一点混响效果
     reverb_delay = int(0.05 * sample_rate)
-    reverb = np.zeros_like(sound)
-    if reverb_delay < len(sound):
-        reverb[reverb_delay:] = sound[:-reverb_delay] * 0.3
-        sound = sound + reverb
-    
-    # 标准化并转换
-    sound = sound / np.max(np.abs(sound)) * 0.9
-    sound_int = np.int16(sound * 32767)
-    
-    wavfile.write(filepath, sample_rate, sound_int)
+    if reverb_delay < n:
+        reverb = mix.scratch(0, n - reverb_delay)
+        np.multiply(mix.buffer[:-reverb_delay], 0.3, out=reverb)
+        mix.add(reverb, offset=reverb_delay)
+
+    # 标准化，转换和写入由导出配置完成
+    return mix.normalize(0.9)
+
+
+# 名称到生成函数的映射，名称即输出文件名（不含扩展名）
+SOUNDS = {
+    "clean_bell": create_clean_bell,
+    "warm_notification": create_warm_notification,
+    "soft_chime": create_soft_chime,
+    "modern_alert": create_modern_alert,
+    "gentle_ding_dong": create_gentle_ding_dong,
+    "uplifting_notification": create_uplifting_notification,
+    "calming_waves": create_calming_waves,
+    "energetic_alert": create_energetic_alert,
+    "peaceful_chimes": create_peaceful_chimes,
+    "motivational_flourish": create_motivational_flourish,
+    "focus_pulse": create_focus_pulse,
+    "gentle_awakening": create_gentle_awakening,
+    "achievement_fanfare": create_achievement_fanfare,
+}
+
+# 支持按参数网格批量生成变体的提醒音，及其可变参数
+BATCH_SOUNDS = {
+    "clean_bell": create_clean_bell_batch,
+    "gentle_ding_dong": create_gentle_ding_dong_batch,
+}
+BATCH_PARAMS = ("duration", "base_freq", "decay_scale")
+
+# 支持分块流式生成任意时长版本的环境音
+STREAMS = {
+    "calming_waves": stream_calming_waves,
+    "focus_pulse": stream_focus_pulse,
+}
+
+
+# 接受 seed 参数的随机化提醒音，可以生成变体池
+RANDOMIZED = tuple(name for name, func in SOUNDS.items() if "seed" in inspect.signature(func).parameters)
+
+# 接受 loop 参数、可以渲染为无缝循环的环境音
+LOOPABLE = tuple(name for name, func in SOUNDS.items() if "loop" in inspect.signature(func).parameters)
+
+
+def sound_params(name, **overrides):
+    """返回提醒音的完整参数（函数默认值加上覆盖值），忽略函数不接受的参数"""
+    sig = inspect.signature(SOUNDS[name])
+    params = {k: p.default for k, p in sig.parameters.items()}
+    params.update((k, v) for k, v in overrides.items() if k in params and v is not None)
+    return params
+
+
+@functools.lru_cache(maxsize=None)
+def _library_digest():
+    """公共合成组件（synth 包）源码的哈希，组件变化时所有提醒音都需要重新生成"""
+    h = hashlib.sha256()
+    package_dir = os.path.dirname(inspect.getfile(synth))
+    for filename in sorted(os.listdir(package_dir)):
+        if filename.endswith(".py"):
+            with open(os.path.join(package_dir, filename), "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()
+
+
+def sound_hash(name, params, reverb=None):
+    """根据函数源码、公共组件源码、参数和混响设置计算提醒音的内容哈希"""
+    h = hashlib.sha256()
+    h.update(inspect.getsource(SOUNDS[name]).encode("utf-8"))
+    h.update(_library_digest().encode("ascii"))
+    h.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+    reverb = _reverb(reverb)
+    if reverb is not None:
+        h.update(json.dumps(list(reverb)).encode("utf-8"))
+    return h.hexdigest()
+
+
+def load_manifest():
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("sounds", {})
+
+
+def save_manifest(sounds):
+    # 原子地替换，避免中断时留下损坏的清单
+    manifest = {"version": MANIFEST_VERSION, "sounds": sounds}
+    write_atomic(manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+
+
+def _stale_profiles(entry, digest, profiles):
+    """返回需要重新导出的配置：哈希变化时全部需要，否则只有文件缺失或配置改变的"""
+    if not entry or entry.get("hash") != digest:
+        return list(profiles)
+    stale = []
+    for profile in profiles:
+        record = entry.get("files", {}).get(profile)
+        if not record or record.get("profile") != list(PROFILES[profile]):
+            stale.append(profile)
+            continue
+        filepath = os.path.join(output_dir, record["file"])
+        if not (os.path.exists(filepath) and os.path.getsize(filepath) == record.get("size")):
+            stale.append(profile)
+    return stale
+
+
+def _reverb(reverb):
+    """混响可以用 REVERBS 中的名称或 Reverb 对象指定"""
+    return REVERBS[reverb] if isinstance(reverb, str) else reverb
+
+
+def render(name, reverb=None, **params):
+    """渲染提醒音并返回 float32 采样（峰值已标准化），不读写任何文件
+
+    params 覆盖函数默认参数（duration、sample_rate、seed 等），未知参数会报错。
+    reverb 不为空时施加卷积混响，输出会加上混响尾巴的长度。
+    """
+    if name not in SOUNDS:
+        raise KeyError(f"未知的提醒音: {name}")
+    samples = SOUNDS[name](**params)
+    reverb = _reverb(reverb)
+    if reverb is not None:
+        samples = apply_reverb(samples, reverb, params.get("sample_rate", SAMPLE_RATE))
+    return samples
+
+
+def render_draft(name, reverb=None, **params):
+    """以 DRAFT_RATE 和更便宜的滤波设置快速渲染草稿，用于反复调整参数，不读写任何文件"""
+    params.setdefault("sample_rate", DRAFT_RATE)
+    with draft_mode():
+        return render(name, reverb=reverb, **params)
+
+
+def preview(names=None, directory=None, seed=None, reverb=None):
+    """以草稿模式渲染指定的提醒音（默认全部），不经过缓存清单
+
+    directory 不为空时才把草稿写成 WAV。返回 [(名称, 耗时秒, 文件路径或 None)]。
+    """
+    names = list(SOUNDS) if not names else list(names)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    results = []
+    with FileWriter() as writer:
+        for name in names:
+            start = time.perf_counter()
+            params = sound_params(name, seed=seed, sample_rate=DRAFT_RATE)
+            samples = render_draft(name, reverb=reverb, **params)
+            elapsed = time.perf_counter() - start
+            path = None
+            if directory:
+                path = _write_wav(os.path.join(directory, name + ".wav"), DRAFT_RATE, to_pcm(samples, 16), writer)
+            results.append((name, elapsed, path))
+    return results
+
+
+def _render_sound(name, params, profiles, reverb=None, writer=None, previews=None):
+    """在工作进程中渲染一次母版，并按各导出配置原子地写入
+
+    writer 不为空时文件交给其 I/O 线程池写出，关闭 writer 之后才完整。
+    previews 为 "full" 或 "peaks" 时同时从内存中的母版计算预览摘要（"peaks" 不含频谱缩略图）。
+    返回 ({配置名: 文件路径}, 预览摘要或 None)。
+    """
+    with trace.stage(name, "render", **params):
+        samples = render(name, reverb=reverb, **params)
+    master = MasterRender(samples, params["sample_rate"])
+    paths = {}
+    for profile in profiles:
+        with trace.stage("export", "export", sound=name, profile=profile):
+            paths[profile] = master.export(PROFILES[profile], PROFILES[profile].path(output_dir, name), writer)
+    summary = None
+    if previews:
+        with trace.stage("summarize", "preview", sound=name):
+            summary = summarize(samples, params["sample_rate"], spectrogram=previews == "full")
+    return paths, summary
+
+
+def _render_sound_traced(name, params, profiles, reverb=None, previews=None):
+    """在工作进程中开启追踪后渲染，返回 (_render_sound 的结果, 本进程记录的追踪事件)"""
+    trace.enable()
+    trace.clear()
+    return _render_sound(name, params, profiles, reverb, previews=previews), trace.events()
+
+
+def write_sound_atlas(digests):
+    """把所有提醒音的 release WAV 打包成图集，索引中记录每个提醒音的输入哈希"""
+    from scipy.io import wavfile
+
+    sounds = {}
+    for name in SOUNDS:
+        rate, samples = wavfile.read(PROFILES["release"].path(output_dir, name))
+        sounds[name] = (samples, rate)
+    write_atlas(atlas_path, sounds, meta={name: {"hash": digests[name]} for name in SOUNDS})
+    return atlas_path
+
+
+def _atlas_is_current(digests):
+    index = load_atlas_index(atlas_path)
+    if index is None or not os.path.exists(atlas_path) or os.path.getsize(atlas_path) != index["size"]:
+        return False
+    return {name: entry.get("hash") for name, entry in index["sounds"].items()} == digests
+
+
+def update_golden(names=None, path=None):
+    """以默认参数渲染指定的提醒音（默认全部）并记录为黄金参考，未指定的提醒音保留原有参考
+
+    返回参考图集的路径。
+    """
+    path = path or golden_path
+    names = list(SOUNDS) if not names else list(names)
+    existing = {}
+    if load_atlas_index(path) is not None:
+        references, index = read_atlas(path, mmap=False)
+        existing = {name: (references[name], entry["sample_rate"], entry.get("hash"))
+                    for name, entry in index["sounds"].items() if name in SOUNDS}
+    for name in names:
+        params = sound_params(name)
+        existing[name] = (to_pcm(render(name, **params), 16), params["sample_rate"], sound_hash(name, params))
+    ordered = [name for name in SOUNDS if name in existing]
+    write_atlas(path, {name: existing[name][:2] for name in ordered},
+                meta={name: {"hash": existing[name][2]} for name in ordered})
+    return path
+
+
+def verify_golden(names=None, path=None):
+    """以默认参数渲染指定的提醒音（默认全部），与黄金参考逐块比较
+
+    返回 [(名称, Comparison 或 None, 超出容差的项目列表)]，参考中缺少的提醒音 Comparison 为 None。
+    参考图集不存在时抛出 ValueError。
+    """
+    path = path or golden_path
+    names = list(SOUNDS) if not names else list(names)
+    references, index = read_atlas(path)
+    results = []
+    for name in names:
+        if name not in references:
+            results.append((name, None, ["参考中没有这个提醒音，请先运行 --update-golden"]))
+            continue
+        params = sound_params(name)
+        with trace.stage(name, "render", **params):
+            samples = to_pcm(render(name, **params), 16)
+        with trace.stage("compare", "verify", sound=name):
+            comparison = compare_pcm(references[name], samples)
+        failures = comparison.failures(GOLDEN_TOLERANCES.get(name, Tolerance()))
+        if index["sounds"][name].get("sample_rate") != params["sample_rate"]:
+            failures.append(f"采样率 {params['sample_rate']} != 参考 {index['sounds'][name]['sample_rate']}")
+        results.append((name, comparison, failures))
+    return results
+
+
+def load_previews():
+    """读取预览摘要文件，返回 {名称: 摘要}，文件缺失或版本不符时返回空字典"""
+    try:
+        with open(previews_path, encoding="utf-8") as f:
+            previews = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if previews.get("version") != PREVIEWS_VERSION:
+        return {}
+    return previews.get("sounds", {})
+
+
+def _preview_is_current(entry, digest, previews):
+    return bool(entry) and entry.get("hash") == digest and ("spectrogram" in entry) == (previews == "full")
+
+
+def generate(names=None, jobs=1, force=False, seed=None, profiles=("release",), atlas=True, reverb=None,
+             previews="full"):
+    """生成指定的提醒音（默认全部），只重新生成输入哈希发生变化或缺失的文件
+
+    每个提醒音只渲染一次母版，再导出为 profiles 中的每种配置。
+    atlas 为真、生成全部提醒音且包含 release 配置时，同时更新打包图集。
+    reverb 为 REVERBS 中的名称或 Reverb 对象时，对所有提醒音施加同一种混响。
+    previews 为 "full"（峰值和频谱缩略图）或 "peaks" 时，同时更新 previews.json，None 时跳过。
+    jobs > 1 时使用进程池并行生成，返回 (文件路径列表, 跳过的名称列表)
+    """
+    names = list(SOUNDS) if not names else list(names)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest()
+    summaries = load_previews() if previews else {}
+
+    params = {name: sound_params(name, seed=seed) for name in names}
+    digests = {name: sound_hash(name, params[name], reverb) for name in names}
+    todo = {}
+    for name in names:
+        stale = list(profiles) if force else _stale_profiles(manifest.get(name), digests[name], profiles)
+        # 文件都是最新的但预览摘要缺失或过期时，仍然渲染一次母版来计算摘要
+        if stale or (previews and not _preview_is_current(summaries.get(name), digests[name], previews)):
+            todo[name] = stale
+    stale_names = list(todo)
+
+    jobs = max(1, min(jobs, len(stale_names)))
+    if jobs == 1:
+        # 写文件在 I/O 线程中进行，与下一个提醒音的渲染重叠
+        with FileWriter() as writer:
+            results = [_render_sound(name, params[name], todo[name], reverb, writer, previews)
+                       for name in stale_names]
+    else:
+        # 开启追踪时由工作进程带回各自记录的事件
+        worker = _render_sound_traced if trace.is_enabled() else _render_sound
+        extra = [[previews] * len(stale_names)] if trace.is_enabled() else [[None] * len(stale_names),
+                                                                            [previews] * len(stale_names)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            # map 保持输入顺序，便于输出稳定
+            results = list(pool.map(worker, stale_names,
+                                    [params[name] for name in stale_names],
+                                    [todo[name] for name in stale_names],
+                                    [reverb] * len(stale_names), *extra))
+        if trace.is_enabled():
+            for _, events in results:
+                trace.extend(events)
+            results = [result for result, _ in results]
+
+    for name, (paths, summary) in zip(stale_names, results):
+        if summary is not None:
+            summaries[name] = {"hash": digests[name], **summary}
+        entry = manifest.get(name)
+        if not entry or entry.get("hash") != digests[name]:
+            entry = manifest[name] = {"hash": digests[name], "files": {}}
+        for profile, path in paths.items():
+            entry["files"][profile] = {
+                "file": os.path.relpath(path, output_dir),
+                "profile": list(PROFILES[profile]),
+                "size": os.path.getsize(path),
+            }
+    if stale_names:
+        save_manifest(manifest)
+
+    if previews and stale_names:
+        write_atomic(previews_path, json.dumps({"version": PREVIEWS_VERSION, "sounds": summaries},
+                                               separators=(",", ":"), sort_keys=True).encode("utf-8"))
+
+    files = [os.path.join(output_dir, manifest[name]["files"][profile]["file"])
+             for name in names for profile in profiles]
+    if previews:
+        files.append(previews_path)
+    # 图集只在生成全部提醒音时更新，避免只含部分提醒音的图集覆盖完整的图集
+    if atlas and "release" in profiles and set(names) == set(SOUNDS):
+        if any("release" in todo[name] for name in todo) or not _atlas_is_current(digests):
+            write_sound_atlas(digests)
+        files.append(atlas_path)
+    skipped = [name for name in names if name not in todo]
+    return files, skipped
+
+
+def render_variants(name, sample_rate=SAMPLE_RATE, reverb=None, **grid):
+    """按参数网格的笛卡尔积批量生成变体，未给出的参数使用函数默认值
+
+    name 必须在 BATCH_SOUNDS 中。reverb 不为空时所有变体在一次 FFT 卷积中施加同一种混响。
+    grid 的键只能是 BATCH_PARAMS 中的参数。
+    返回 (参数字典列表, 二维 int16 数组, 每个变体的采样数)。
+    """
+    if name not in BATCH_SOUNDS:
+        raise ValueError(f"{name} 不支持批量生成，可选: " + ", ".join(BATCH_SOUNDS))
+    unknown = set(grid) - set(BATCH_PARAMS)
+    if unknown:
+        raise ValueError(f"{name} 的批量网格不支持参数: " + ", ".join(sorted(unknown)))
+    defaults = sound_params(name)
+    axes = {k: list(grid.get(k, [defaults[k]])) for k in BATCH_PARAMS}
+    variants, columns = expand_grid(**axes)
+    samples, lengths = render_batch(BATCH_SOUNDS[name], columns, sample_rate)
+    reverb = _reverb(reverb)
+    if reverb is not None:
+        wet = apply_reverb(samples * DTYPE(1 / 32767), reverb, sample_rate, axis=1)
+        lengths = lengths + (wet.shape[1] - samples.shape[1])
+        samples = np.multiply(wet, DTYPE(32767), out=wet).astype(np.int16)
+    return variants, samples, lengths
+
+
+def export_variants(name, directory, sample_rate=SAMPLE_RATE, **grid):
+    """批量生成变体并逐个写入 directory，返回文件路径列表"""
+    _, samples, lengths = render_variants(name, sample_rate=sample_rate, **grid)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    with FileWriter() as writer:
+        for i, (row, length) in enumerate(zip(samples, lengths)):
+            paths.append(_write_wav(os.path.join(directory, f"{name}_{i:03d}.wav"), sample_rate, row[:length], writer))
+    return paths
+
+
+def _stream_sound(name, filepath, duration, seed):
+    """在工作进程中流式生成长时间版本的环境音，返回文件路径"""
+    kwargs = {} if seed is None else {"seed": seed}
+    write_wav_stream(filepath, SAMPLE_RATE, STREAMS[name](duration=duration, **kwargs))
     return filepath
 
 
-# 生成所有提醒音
-print("正在生成多种提醒音...")
-files = [
-    create_clean_bell(),
-    create_warm_notification(),
-    create_soft_chime(),
-    create_modern_alert(),
-    create_gentle_ding_dong(),
-    create_uplifting_notification(),
-    create_calming_waves(),
-    create_energetic_alert(),
-    create_peaceful_chimes(),
-    create_motivational_flourish(),
-    create_focus_pulse(),
-    create_gentle_awakening(),
-    create_achievement_fanfare()
-]
-
-print("\n所有提醒音已成功生成在以下位置:")
-for file in files:
-    print(f"- {file}")
-print("\n你可以根据喜好选择使用任何一种提醒音。")
\ No newline at end of file
+def generate_loops(names=None, directory=None, duration=None, seed=None):
+    """渲染可无缝循环的环境音（默认全部），写出 release WAV 和循环点旁车文件，返回文件路径列表
+
+    duration 为期望时长，实际取最接近的整数个调制周期（默认使用函数的默认时长）。
+    旁车文件 {名称}.loop.json 记录循环区间 [loop_start, loop_end)（以采样为单位）和采样率，
+    播放器把整段设为循环即可，不需要渐入渐出或交叉淡化。
+    """
+    names = list(LOOPABLE) if not names else list(names)
+    directory = directory or loops_dir
+    paths = []
+    with FileWriter() as writer:
+        for name in names:
+            params = sound_params(name, duration=duration, seed=seed, loop=True)
+            samples = render(name, **params)
+            wav_path = PROFILES["release"].path(directory, name)
+            MasterRender(samples, params["sample_rate"]).export(PROFILES["release"], wav_path, writer)
+            meta = {
+                "file": os.path.basename(wav_path),
+                "sample_rate": PROFILES["release"].sample_rate,
+                "length": len(samples),
+                "loop_start": 0,
+                "loop_end": len(samples),
+                "seconds": len(samples) / params["sample_rate"],
+                # 循环点处的跳变相对相邻样本差的典型值，约为 1 或更小说明衔接无缝
+                "seam_jump": round(seam_jump(samples), 3),
+            }
+            sidecar = os.path.join(directory, name + ".loop.json")
+            writer.submit(sidecar, json.dumps(meta, indent=2, sort_keys=True).encode("utf-8"))
+            paths += [wav_path, sidecar]
+    return paths
+
+
+def generate_streams(names, duration, directory, jobs=1, seed=None):
+    """流式生成指定时长的环境音到 directory，不经过缓存清单"""
+    names = list(STREAMS) if not names else list(names)
+    os.makedirs(directory, exist_ok=True)
+    paths = [os.path.join(directory, f"{name}_{duration:g}s.wav") for name in names]
+    jobs = max(1, min(jobs, len(names)))
+    if jobs == 1:
+        return [_stream_sound(name, path, duration, seed) for name, path in zip(names, paths)]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_stream_sound, names, paths,
+                             [duration] * len(names), [seed] * len(names)))
+
+
+def load_variant_index():
+    """读取变体池索引，返回 {名称: [变体记录, ...]}，索引缺失或版本不符时返回空字典"""
+    try:
+        with open(variants_index_path, encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if index.get("version") != VARIANTS_VERSION:
+        return {}
+    return index.get("sounds", {})
+
+
+def _save_variant_index(sounds):
+    # 原子地替换，应用读到的索引总是完整的，且只列出已写完的变体
+    index = {"version": VARIANTS_VERSION, "sounds": sounds}
+    write_atomic(variants_index_path, json.dumps(index, indent=2, sort_keys=True).encode("utf-8"))
+
+
+def _variant_is_current(record, digest):
+    filepath = os.path.join(variants_dir, record["file"])
+    return (record.get("hash") == digest and os.path.exists(filepath)
+            and os.path.getsize(filepath) == record.get("size"))
+
+
+def _render_variant(name, params):
+    """在工作进程中渲染一个变体并写入 release WAV，返回文件路径"""
+    path = PROFILES["release"].path(os.path.join(variants_dir, name), f"{params['seed']:03d}")
+    return MasterRender(render(name, **params), params["sample_rate"]).export(PROFILES["release"], path)
+
+
+def fill_variant_pool(names=None, size=8, jobs=1):
+    """把每个随机化提醒音（默认全部）的变体池补足到 size 个，使用种子 1..size
+
+    种子 0 就是打包的默认版本。输入哈希未变且文件完整的变体直接保留，只渲染缺失或过期的；
+    每写完一个变体就原子地更新一次索引，应用随时读取索引都能拿到已完成的变体，不需要等待渲染。
+    超出 size 的旧变体会从索引和磁盘上移除。返回新渲染的文件路径列表。
+    """
+    names = list(RANDOMIZED) if not names else list(names)
+    for name in names:
+        if name not in RANDOMIZED:
+            raise KeyError(f"{name} 不是随机化提醒音，可选: " + ", ".join(RANDOMIZED))
+    os.makedirs(variants_dir, exist_ok=True)
+    index = load_variant_index()
+
+    todo = []
+    for name in names:
+        records = {record["seed"]: record for record in index.get(name, [])}
+        for seed in sorted(records):
+            if seed > size:
+                stale = os.path.join(variants_dir, records.pop(seed)["file"])
+                if os.path.exists(stale):
+                    os.remove(stale)
+        for seed in range(1, size + 1):
+            params = sound_params(name, seed=seed)
+            digest = sound_hash(name, params)
+            if seed in records and _variant_is_current(records[seed], digest):
+                continue
+            records.pop(seed, None)
+            todo.append((name, params, digest))
+        index[name] = [records[seed] for seed in sorted(records)]
+    _save_variant_index(index)
+
+    def finish(name, params, digest, path):
+        records = [record for record in index[name] if record["seed"] != params["seed"]]
+        records.append({"seed": params["seed"], "file": os.path.relpath(path, variants_dir),
+                        "hash": digest, "size": os.path.getsize(path)})
+        index[name] = sorted(records, key=lambda record: record["seed"])
+        _save_variant_index(index)
+        return path
+
+    jobs = max(1, min(jobs, len(todo)))
+    if jobs == 1:
+        return [finish(name, params, digest, _render_variant(name, params)) for name, params, digest in todo]
+    paths = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(_render_variant, name, params): (name, params, digest)
+                   for name, params, digest in todo}
+        # 按完成顺序更新索引，先渲染完的变体先可用
+        for future in as_completed(futures):
+            paths.append(finish(*futures[future], future.result()))
+    return paths
+
+
+class VariantPool:
+    """按索引轮换随机化提醒音的变体，需要时在后台线程补足变体池
+
+    next() 从不等待渲染：池中还没有变体时返回打包的默认版本。
+    """
+
+    def __init__(self, size=8, jobs=1):
+        self.size = size
+        self.jobs = jobs
+        self._cursor = {}
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def top_up(self, names=None):
+        """在后台线程中补足变体池，已有补足任务在运行时不重复启动，返回该线程"""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=fill_variant_pool, args=(names, self.size, self.jobs),
+                                                name="variant-pool", daemon=True)
+                self._worker.start()
+            return self._worker
+
+    def next(self, name):
+        """返回 name 的下一个可用变体的文件路径，变体池不满时顺便在后台补足"""
+        if name not in RANDOMIZED:
+            raise KeyError(f"{name} 不是随机化提醒音，可选: " + ", ".join(RANDOMIZED))
+        records = load_variant_index().get(name, [])
+        if len(records) < self.size:
+            self.top_up()
+        if not records:
+            return PROFILES["release"].path(output_dir, name)
+        with self._lock:
+            cursor = self._cursor.get(name, -1) + 1
+            self._cursor[name] = cursor
+        return os.path.join(variants_dir, records[cursor % len(records)]["file"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成专注助手使用的提醒音")
+    parser.add_argument("names", nargs="*", metavar="NAME",
+                        help="要生成的提醒音名称，默认生成全部：" + ", ".join(SOUNDS))
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="并行生成使用的进程数（默认为 CPU 核心数）")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="随机化提醒音使用的随机种子（默认使用各函数内置的固定种子）")
+    parser.add_argument("--force", action="store_true", help="忽略缓存清单，强制重新生成")
+    parser.add_argument("--profile", action="append", choices=list(PROFILES), dest="profiles",
+                        help="导出配置，可重复指定（默认 release）：" + ", ".join(
+                            f"{k}={p.format}/{p.sample_rate}Hz/{p.bits}bit" for k, p in PROFILES.items()))
+    parser.add_argument("--stream", type=float, metavar="SECONDS",
+                        help="以流式模式生成指定时长的环境音（仅支持 " + ", ".join(STREAMS) + "）")
+    parser.add_argument("--stream-dir", default=".", metavar="DIR",
+                        help="流式生成的输出目录（默认当前目录，避免长文件被打包）")
+    parser.add_argument("--loop", action="store_true",
+                        help="生成可无缝循环的环境音（仅支持 " + ", ".join(LOOPABLE) + "）和循环点旁车文件")
+    parser.add_argument("--loop-dir", metavar="DIR", help="循环的输出目录（默认 " + loops_dir + "）")
+    parser.add_argument("--reverb", choices=list(REVERBS),
+                        help="对所有提醒音施加 FFT 卷积混响（默认不加）：" + ", ".join(
+                            f"{k}={r.rt60:g}s" for k, r in REVERBS.items()))
+    parser.add_argument("--draft", action="store_true",
+                        help=f"草稿模式：以 {DRAFT_RATE} Hz 和更便宜的滤波快速渲染，默认不写文件")
+    parser.add_argument("--draft-dir", metavar="DIR", help="草稿模式下把草稿 WAV 写入此目录")
+    parser.add_argument("--variants", type=int, metavar="N",
+                        help="为随机化提醒音（" + ", ".join(RANDOMIZED) + "）补足 N 个预渲染变体，写入 variants/ 和索引")
+    parser.add_argument("--previews", choices=("full", "peaks", "none"), default="full",
+                        help="previews.json 中的波形预览：full 为峰值和频谱缩略图（默认），peaks 只有峰值，none 不生成")
+    parser.add_argument("--verify", action="store_true",
+                        help="以默认参数渲染并与黄金参考比较最大误差、信噪比和谱距离，超出容差时返回非零")
+    parser.add_argument("--update-golden", action="store_true", help="重新记录黄金参考（确认声音的改动是有意的之后）")
+    parser.add_argument("--golden", metavar="PATH", help="黄金参考图集路径（默认 " + golden_path + "）")
+    parser.add_argument("--no-atlas", action="store_true",
+                        help="不更新打包所有提醒音的 PCM 图集（atlas.pcm / atlas.json）")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="记录各合成阶段的耗时和分配大小，写成 Chrome trace JSON（可在 chrome://tracing 或 Perfetto 中查看）")
+    parser.add_argument("--list", action="store_true", help="列出所有可用的提醒音后退出")
+    args = parser.parse_args(argv)
+    known = STREAMS if args.stream else LOOPABLE if args.loop else SOUNDS
+    unknown = [name for name in args.names if name not in known]
+    if unknown:
+        parser.error("未知的提醒音: " + ", ".join(unknown))
+
+    if args.list:
+        for name in SOUNDS:
+            print(name)
+        return 0
+
+    start = time.perf_counter()
+    if args.stream:
+        print(f"正在流式生成 {args.stream:g} 秒的环境音...")
+        files = generate_streams(args.names, args.stream, args.stream_dir, jobs=args.jobs, seed=args.seed)
+        for file in files:
+            print(f"- {file}")
+        print(f"\n共 {len(files)} 个文件，耗时 {time.perf_counter() - start:.2f} 秒")
+        return 0
+
+    if args.loop:
+        print("正在生成可无缝循环的环境音...")
+        files = generate_loops(args.names, args.loop_dir, seed=args.seed)
+        for file in files:
+            print(f"- {file}")
+        print(f"\n共 {len(files)} 个文件，耗时 {time.perf_counter() - start:.2f} 秒")
+        return 0
+
+    if args.variants is not None:
+        unknown = [name for name in args.names if name not in RANDOMIZED]
+        if unknown:
+            parser.error("不是随机化提醒音: " + ", ".join(unknown))
+        print(f"正在补足每个随机化提醒音的 {args.variants} 个变体...")
+        files = fill_variant_pool(args.names, args.variants, jobs=args.jobs)
+        for file in files:
+            print(f"- {file}")
+        print(f"\n新生成 {len(files)} 个变体，索引位于 {variants_index_path}，"
+              f"耗时 {time.perf_counter() - start:.2f} 秒")
+        return 0
+
+    if args.update_golden:
+        path = update_golden(args.names, args.golden)
+        print(f"黄金参考已写入 {path}，耗时 {time.perf_counter() - start:.2f} 秒")
+        return 0
+
+    if args.verify:
+        try:
+            results = verify_golden(args.names, args.golden)
+        except ValueError as e:
+            print(f"{e}\n请先运行 --update-golden 记录参考", file=sys.stderr)
+            return 2
+        failed = 0
+        for name, comparison, failures in results:
+            if comparison is not None:
+                print(f"- {name:24s} 最大误差 {comparison.max_abs:5d} LSB  信噪比 {comparison.snr_db:7.1f} dB  "
+                      f"谱距离 {comparison.lsd_db:6.3f} dB  " + ("失败" if failures else "通过"))
+            for failure in failures:
+                print(f"    {name}: {failure}")
+            failed += bool(failures)
+        print(f"\n{len(results) - failed} 个通过，{failed} 个失败，耗时 {time.perf_counter() - start:.2f} 秒")
+        return 1 if failed else 0
+
+    if args.draft:
+        print(f"正在以 {DRAFT_RATE} Hz 渲染草稿...")
+        results = preview(args.names, args.draft_dir, seed=args.seed, reverb=args.reverb)
+        for name, elapsed, path in results:
+            print(f"- {name:24s} {elapsed * 1000:7.2f} ms" + (f"  {path}" if path else ""))
+        print(f"\n共 {len(results)} 个草稿，耗时 {time.perf_counter() - start:.3f} 秒")
+        return 0
+
+    print("正在生成多种提醒音...")
+    if args.trace:
+        trace.enable()
+    files, skipped = generate(args.names, jobs=args.jobs, force=args.force, seed=args.seed,
+                              profiles=args.profiles or ("release",), atlas=not args.no_atlas, reverb=args.reverb,
+                              previews=None if args.previews == "none" else args.previews)
+    if args.trace:
+        trace.write(args.trace)
+        print(f"\n追踪记录已写入 {args.trace}")
+
+    print("\n所有提醒音已成功生成在以下位置:")
+    for file in files:
+        print(f"- {file}")
+    print(f"\n共 {len(files)} 个文件（{len(skipped)} 个未变化已跳过），"
+          f"耗时 {time.perf_counter() - start:.3f} 秒")
+    print("你可以根据喜好选择使用任何一种提醒音。")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
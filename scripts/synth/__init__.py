@@ -0,0 +1,96 @@
+"""提醒音合成的公共组件"""
+from . import fused, trace
+from .additive import additive
+from .atlas import ATLAS_ALIGN, atlas_index_path, load_atlas_index, read_atlas, write_atlas
+from .batch import BatchMixer, batch_exp_decay, batch_phase, batch_sine, expand_grid, render_batch
+from .effects import Allpass, Chain, Comb, Filter, OnePole, apply_sos, design, draft_mode, in_draft_mode
+from .export import PROFILES, ExportProfile, MasterRender, resample, to_pcm
+from .golden import GOLDEN_BLOCK, Comparison, Tolerance, compare_pcm
+from .kernels import accumulate_phase, allpass, comb, one_pole
+from .loop import loop_frequency, loop_length, seam_jump
+from .mixer import Mixer
+from .noise import NOISE_COLORS, noise_table
+from .oscillator import DTYPE, exp_decay, exp_rise, phase, ramp, sine, time_axis
+from .peaks import peak_levels, spectrogram_thumbnail, summarize
+from .reverb import REVERBS, Reverb, apply_reverb, impulse_response
+from .sequencer import DEFAULT_FLOOR_DB, SINE, Envelope, Note, Partial, active_length, render_notes
+from .stream import STREAM_BLOCK, StreamFilter, apply_fades, block_ranges, noise_gain, tone_peak, write_wav_stream
+from .wavetable import max_harmonics, wavetable
+from .writer import FileWriter, write_atomic
+
+__all__ = [
+    "ATLAS_ALIGN",
+    "Allpass",
+    "BatchMixer",
+    "Chain",
+    "Comb",
+    "Comparison",
+    "DEFAULT_FLOOR_DB",
+    "DTYPE",
+    "Envelope",
+    "ExportProfile",
+    "FileWriter",
+    "Filter",
+    "GOLDEN_BLOCK",
+    "MasterRender",
+    "Mixer",
+    "NOISE_COLORS",
+    "Note",
+    "OnePole",
+    "PROFILES",
+    "Partial",
+    "REVERBS",
+    "Reverb",
+    "SINE",
+    "STREAM_BLOCK",
+    "StreamFilter",
+    "Tolerance",
+    "accumulate_phase",
+    "active_length",
+    "additive",
+    "allpass",
+    "apply_fades",
+    "apply_reverb",
+    "apply_sos",
+    "atlas_index_path",
+    "batch_exp_decay",
+    "batch_phase",
+    "batch_sine",
+    "block_ranges",
+    "comb",
+    "compare_pcm",
+    "design",
+    "draft_mode",
+    "exp_decay",
+    "exp_rise",
+    "expand_grid",
+    "fused",
+    "impulse_response",
+    "in_draft_mode",
+    "load_atlas_index",
+    "loop_frequency",
+    "loop_length",
+    "max_harmonics",
+    "noise_gain",
+    "noise_table",
+    "one_pole",
+    "peak_levels",
+    "phase",
+    "ramp",
+    "read_atlas",
+    "render_batch",
+    "render_notes",
+    "resample",
+    "seam_jump",
+    "sine",
+    "spectrogram_thumbnail",
+    "summarize",
+    "time_axis",
+    "to_pcm",
+    "tone_peak",
+    "trace",
+    "wavetable",
+    "write_atlas",
+    "write_atomic",
+    "write_wav_stream",
+]
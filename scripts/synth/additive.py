@@ -0,0 +1,192 @@
+"""加性合成：一次计算一组分音
+
+逐个分音调用正弦振荡器时，每个分音都要单独计算相位、回绕、求 sin 再累加。这里把分音按
+"基础倍数 × 整数倍"分组：同一基础倍数的整数倍谐波 Σ a_k·sin(kθ) 沿 Chebyshev 递推
+sin((k+1)θ) = 2cosθ·sin(kθ) - sin((k-1)θ) 以 Clenshaw 嵌套形式求值：
+b_k = a_k + 2cosθ·b_(k+1) - b_(k+2)，结果为 b_1·sinθ。只需要一对 sin / cos，每多一个谐波只多几次乘加；
+互不成整数倍的各个基础倍数（非谐波分音）的相位排成一个矩阵，一次 np.sin / np.cos 批量计算。
+额外衰减相同的分音共用一条指数包络，整段计算都在 BLOCK 大小的块内原地完成。
+"""
+import functools
+
+import numpy as np
+
+from . import trace
+from .oscillator import BLOCK as PHASE_BLOCK, DTYPE, TWO_PI
+
+# 每块 16384 个采样，每行 64 KB，几行中间结果能同时留在 L2 缓存中；
+# 块内相位仍按 oscillator.BLOCK 分段计算起点，精度与 oscillator.phase 相同
+BLOCK = 4 * PHASE_BLOCK
+
+# 超过这个倍数的分音单独作为基础倍数，float32 递推误差约随倍数平方增长
+MAX_HARMONIC = 16
+
+
+@functools.lru_cache(maxsize=128)
+def _plan(partials):
+    """把分音整理为 (基础倍数元组, 每个基础倍数的 ((衰减序号, (a_1, ..., a_K)), ...), 衰减速率元组)
+
+    需要 cos（K > 1）的基础倍数排在前面。
+    """
+    decays = tuple(sorted({float(p.extra_decay) for p in partials}))
+    bases = []
+    series = []
+    for p in sorted(partials, key=lambda p: p.ratio):
+        for base, coeffs in zip(bases, series):
+            k = round(p.ratio / base)
+            if k <= MAX_HARMONIC and abs(p.ratio - k * base) <= 1e-9 * p.ratio:
+                break
+        else:
+            k, coeffs = 1, {}
+            bases.append(float(p.ratio))
+            series.append(coeffs)
+        a = coeffs.setdefault(decays.index(p.extra_decay), {})
+        a[k] = a.get(k, 0.0) + float(p.amp)
+    series = [tuple((d, tuple(a.get(k, 0.0) for k in range(1, max(a) + 1))) for d, a in sorted(coeffs.items()))
+              for coeffs in series]
+    order = sorted(range(len(bases)), key=lambda i: max(len(a) for _, a in series[i]) == 1)
+    return tuple(bases[i] for i in order), tuple(series[i] for i in order), decays
+
+
+def _clenshaw(coeffs, sin, cos, out, work, doubled=False):
+    """out = Σ a_k·sin(kθ)，sin 为 sinθ，cos 为 cosθ（doubled 为真时为 2cosθ），work 为两个临时缓冲区"""
+    top = len(coeffs)
+    if top == 1:
+        return np.multiply(sin, DTYPE(coeffs[0]), out=out)
+    if top > 2 and not doubled:
+        raise ValueError("三个以上谐波的递推需要 2cosθ")
+    # b_K 为标量 a_K，b_(K-1) = a_(K-1) + 2cosθ·a_K
+    b1, b2 = work
+    np.multiply(cos, DTYPE(coeffs[-1] if doubled else 2 * coeffs[-1]), out=b1)
+    if coeffs[-2]:
+        np.add(b1, DTYPE(coeffs[-2]), out=b1)
+    b2_scalar = DTYPE(coeffs[-1])
+    for k in range(top - 2, 0, -1):
+        # b_k = a_k + 2cosθ·b_(k+1) - b_(k+2)，写入 b_(k+2) 所在的缓冲区
+        np.multiply(cos, b1, out=out)
+        if b2_scalar is not None:
+            np.subtract(out, b2_scalar, out=b2)
+            b2_scalar = None
+        else:
+            np.subtract(out, b2, out=b2)
+        if coeffs[k - 1]:
+            np.add(b2, DTYPE(coeffs[k - 1]), out=b2)
+        b1, b2 = b2, b1
+    return np.multiply(b1, sin, out=out)
+
+
+def _forward(terms, sin, cos, rows, written, work):
+    """逐个递推 sin(kθ) 并按衰减分组分别累加进 rows，cos 为 2cosθ，sin 所在的缓冲区会被覆盖
+
+    同一基础倍数的谐波分属多种衰减时，分组做 Clenshaw 会重复递推，这时改用前向递推。
+    """
+    tmp, spare, following = work
+    previous, cur = None, sin
+    top = max(len(a) for _, a in terms)
+    for k in range(1, top + 1):
+        for d, coeffs in terms:
+            if k > len(coeffs) or not coeffs[k - 1]:
+                continue
+            if written[d]:
+                np.multiply(cur, DTYPE(coeffs[k - 1]), out=tmp)
+                np.add(rows[d], tmp, out=rows[d])
+            else:
+                np.multiply(cur, DTYPE(coeffs[k - 1]), out=rows[d])
+                written[d] = True
+        if k == top:
+            break
+        # sin((k+1)θ) = 2cosθ·sin(kθ) - sin((k-1)θ)，三个缓冲区轮换使用
+        np.multiply(cos, cur, out=following)
+        if previous is None:
+            previous, cur, following = cur, following, spare
+        else:
+            np.subtract(following, previous, out=following)
+            previous, cur, following = cur, following, previous
+
+
+@trace.traced("additive", "oscillator")
+def additive(partials, freq, n, sample_rate, out=None, phase0=0.0, start=0.0):
+    """Σ amp · exp(-extra_decay · (t + start)) · sin(2π · ratio · (freq · t + phase0))
+
+    partials 为 Partial 元组（频率倍数、幅度、额外衰减速率），freq 为标量基频，
+    phase0 为基频的起始相位（以周期为单位），每个分音的起始相位为 ratio · phase0。
+    """
+    if out is None:
+        trace.alloc(n * np.dtype(DTYPE).itemsize)
+        out = np.empty(n, dtype=DTYPE)
+    elif len(out) != n:
+        raise ValueError(f"输出缓冲区长度 {len(out)} 与所需长度 {n} 不一致")
+    bases, series, decays = _plan(tuple(partials))
+    tops = [max(len(a) for _, a in terms) for terms in series]
+    recur = sum(top > 1 for top in tops)
+    m = min(n, BLOCK)
+    padded = -(-m // PHASE_BLOCK) * PHASE_BLOCK
+    inc = float(freq) / sample_rate
+
+    steps = np.arange(PHASE_BLOCK, dtype=DTYPE)
+    index = np.arange(m, dtype=DTYPE)
+    incs = np.array([b * inc for b in bases], dtype=DTYPE)[:, None, None]
+    angle = np.empty((len(bases), padded), dtype=DTYPE)
+    cos = np.empty((len(bases), padded), dtype=DTYPE)
+    # 每种衰减一个累加行，第 0 行直接是输出块，其余各行乘以各自的包络后累加进去
+    acc = np.empty((len(decays) - 1, m), dtype=DTYPE)
+    work = np.empty((3, m), dtype=DTYPE)
+
+    for begin in range(0, n, BLOCK):
+        size = min(BLOCK, n - begin)
+        block = out[begin:begin + size]
+        rows = [block] + list(acc[:, :size])
+        written = [False] * len(rows)
+        tmp, b1, b2 = work[:, :size]
+
+        # 各段起点的相位用 float64 标量精确计算，与 oscillator.phase 的做法一致
+        chunks = -(-size // PHASE_BLOCK)
+        starts = begin + PHASE_BLOCK * np.arange(chunks)
+        offsets = (np.multiply.outer(bases, phase0 + starts * inc) % 1.0).astype(DTYPE)[:, :, None]
+        segments = angle[:, :chunks * PHASE_BLOCK].reshape(len(bases), chunks, PHASE_BLOCK)
+        np.multiply(incs, steps, out=segments)
+        np.add(segments, offsets, out=segments)
+        a = angle[:, :size]
+        c = cos[:, :size]
+        np.floor(a, out=c)
+        np.subtract(a, c, out=a)
+        np.multiply(a, DTYPE(TWO_PI), out=a)
+        if recur:
+            np.cos(a[:recur], out=c[:recur])
+        np.sin(a, out=a)
+
+        for i, (terms, top) in enumerate(zip(series, tops)):
+            forward = top > 1 and len(terms) > 1
+            # 三个以上谐波或前向递推时预先算好 2cosθ，省去每步递推的一次乘法
+            doubled = top > 2 or forward
+            if doubled:
+                np.multiply(c[i], DTYPE(2), out=c[i])
+            if forward:
+                _forward(terms, a[i], c[i], rows, written, (tmp, b1, b2))
+                continue
+            for d, coeffs in terms:
+                if written[d]:
+                    np.add(rows[d], _clenshaw(coeffs, a[i], c[i], tmp, (b1, b2), doubled), out=rows[d])
+                else:
+                    _clenshaw(coeffs, a[i], c[i], rows[d], (b1, b2), doubled)
+                    written[d] = True
+
+        for d, rate in enumerate(decays):
+            # 幅度全为 0 的衰减组没有写入任何内容
+            if not written[d]:
+                if not d:
+                    block.fill(0)
+                continue
+            # 速率为 0（额外衰减有负值时不一定是第 0 行）的行不乘包络，但仍要累加
+            if rate:
+                env = tmp
+                np.add(index[:size], DTYPE(begin), out=env)
+                np.multiply(env, DTYPE(1.0 / sample_rate), out=env)
+                if start:
+                    np.add(env, DTYPE(start), out=env)
+                np.multiply(env, DTYPE(-rate), out=env)
+                np.exp(env, out=env)
+                np.multiply(rows[d], env, out=rows[d])
+            if d:
+                np.add(block, rows[d], out=block)
+    return out
@@ -0,0 +1,95 @@
+"""打包的 PCM 图集
+
+把所有提醒音的 16 位小端 PCM 按对齐的偏移量依次写进一个文件，另附一个 JSON 索引
+记录每个提醒音的 (偏移字节, 帧数, 采样率, 声道数)。使用方只需 mmap 一次文件，
+按索引切片即可得到任意提醒音，不需要查找多个路径，也不需要解析 WAV 或运行解码器。
+"""
+import json
+import os
+
+import numpy as np
+
+from .writer import write_atomic
+
+ATLAS_VERSION = 1
+
+# 每个提醒音的起始偏移按缓存行对齐，切片得到的视图可以直接交给 SIMD / 音频 API
+ATLAS_ALIGN = 64
+
+_PCM_DTYPE = np.dtype("<i2")
+
+
+def atlas_index_path(path):
+    """图集数据文件对应的索引文件路径：atlas.pcm -> atlas.json"""
+    return os.path.splitext(path)[0] + ".json"
+
+
+def write_atlas(path, sounds, align=ATLAS_ALIGN, meta=None):
+    """把 {名称: (int16 采样, 采样率)} 写成图集 path 和索引，返回索引字典
+
+    多声道采样的形状为 (帧数, 声道数)，按帧交错存放。meta 为 {名称: 附加字段}，会写进索引。
+    """
+    entries = {}
+    chunks = []
+    offset = 0
+    for name, (samples, sample_rate) in sounds.items():
+        pad = -offset % align
+        if pad:
+            chunks.append(bytes(pad))
+            offset += pad
+        data = np.ascontiguousarray(samples, dtype=_PCM_DTYPE)
+        entries[name] = {
+            "offset": offset,
+            "length": int(data.shape[0]),
+            "sample_rate": int(sample_rate),
+            "channels": 1 if data.ndim == 1 else int(data.shape[1]),
+            **(meta or {}).get(name, {}),
+        }
+        chunks.append(data.tobytes())
+        offset += data.nbytes
+
+    index = {
+        "version": ATLAS_VERSION,
+        "file": os.path.basename(path),
+        "dtype": "int16",
+        "byteorder": "little",
+        "align": align,
+        "size": offset,
+        "sounds": entries,
+    }
+    # 原子地替换，读取方不会看到写了一半的图集；内容未变时不重写
+    write_atomic(path, b"".join(chunks))
+    write_atomic(atlas_index_path(path), json.dumps(index, indent=2, sort_keys=True).encode("utf-8"))
+    return index
+
+
+def load_atlas_index(path):
+    """读取图集索引，文件缺失、损坏或版本不符时返回 None"""
+    try:
+        with open(atlas_index_path(path), encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != ATLAS_VERSION:
+        return None
+    return index
+
+
+def read_atlas(path, mmap=True):
+    """读取图集，返回 ({名称: int16 采样视图}, 索引)
+
+    mmap 为真时使用 np.memmap，只映射一次文件，各提醒音都是零拷贝视图；否则整个读入内存。
+    """
+    index = load_atlas_index(path)
+    if index is None:
+        raise ValueError(f"找不到有效的图集索引: {atlas_index_path(path)}")
+    if mmap:
+        data = np.memmap(path, dtype=_PCM_DTYPE, mode="r")
+    else:
+        data = np.fromfile(path, dtype=_PCM_DTYPE)
+    sounds = {}
+    for name, entry in index["sounds"].items():
+        start = entry["offset"] // _PCM_DTYPE.itemsize
+        view = data[start:start + entry["length"] * entry["channels"]]
+        sounds[name] = view if entry["channels"] == 1 else view.reshape(-1, entry["channels"])
+    return sounds, index
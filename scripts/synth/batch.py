@@ -0,0 +1,140 @@
+"""参数网格的批量变体渲染
+
+同一个提醒音的多个变体（不同音高、衰减速率、时长）放在一个 (变体数 × 采样数) 的
+二维 float32 缓冲区里一次计算，标准化和 int16 转换也按行向量化完成，
+避免逐个变体调用函数带来的 Python 开销和重复的临时数组。
+"""
+import itertools
+
+import numpy as np
+
+from .oscillator import BLOCK, DTYPE, TWO_PI, time_axis
+
+# 每次计算的行块大小：让一个 (行数 × 采样数) 的 float32 缓冲区落在 L2 缓存内，
+# 整个网格一次性计算时工作集远大于缓存，反而比逐个变体更慢
+TILE_BYTES = 1 << 20
+
+
+def expand_grid(**axes):
+    """把每个参数的取值列表展开成笛卡尔积，返回 (参数字典列表, 每个参数一列的数组字典)"""
+    names = list(axes)
+    variants = [dict(zip(names, values)) for values in itertools.product(*(axes[k] for k in names))]
+    columns = {k: np.array([v[k] for v in variants], dtype=float) for k in names}
+    return variants, columns
+
+
+def render_batch(batch_fn, columns, sample_rate, tile_bytes=TILE_BYTES):
+    """按行块调用批量渲染函数 batch_fn(sample_rate=..., **columns)
+
+    columns 中必须有 duration 列。返回 (二维 int16 数组, 每行有效长度)。
+    """
+    lengths = (sample_rate * columns["duration"]).astype(int)
+    samples = np.zeros((len(lengths), int(lengths.max())), dtype=np.int16)
+    rows = max(1, tile_bytes // (int(lengths.max()) * np.dtype(DTYPE).itemsize))
+    for start in range(0, len(lengths), rows):
+        tile = {k: v[start:start + rows] for k, v in columns.items()}
+        block, _ = batch_fn(sample_rate=sample_rate, **tile)
+        samples[start:start + rows, :block.shape[1]] = block
+    return samples, lengths
+
+
+def batch_phase(freq, n, sample_rate, out, phase0=None):
+    """每行一个频率的相位矩阵（以周期为单位，落在 [0, 1) 内），与 oscillator.phase 逐行一致"""
+    freq = np.asarray(freq, dtype=float)
+    inc = freq / sample_rate
+    start_phase = np.zeros_like(inc) if phase0 is None else np.asarray(phase0, dtype=float)
+    steps = np.arange(min(n, BLOCK), dtype=DTYPE)
+    inc32 = inc.astype(DTYPE)[:, None]
+    whole = np.empty((len(inc), len(steps)), dtype=DTYPE)
+    for start in range(0, n, BLOCK):
+        block = out[:, start:start + BLOCK]
+        m = block.shape[1]
+        np.multiply(steps[None, :m], inc32, out=block)
+        np.add(block, ((start_phase + start * inc) % 1.0).astype(DTYPE)[:, None], out=block)
+        # 回绕到 [0, 1)
+        np.floor(block, out=whole[:, :m])
+        np.subtract(block, whole[:, :m], out=block)
+    return out
+
+
+def batch_sine(freq, n, sample_rate, out, amp=1.0, phase0=None):
+    """每行一个频率（和幅度）的正弦波矩阵"""
+    out = batch_phase(freq, n, sample_rate, out, phase0=phase0)
+    np.multiply(out, DTYPE(TWO_PI), out=out)
+    np.sin(out, out=out)
+    if np.ndim(amp) or amp != 1.0:
+        np.multiply(out, np.asarray(amp, dtype=DTYPE).reshape(-1, 1), out=out)
+    return out
+
+
+def batch_exp_decay(rate, n, sample_rate, out, start=0.0):
+    """每行一个衰减速率的指数包络 exp(-rate * (t + start))"""
+    t = time_axis(n, sample_rate, start=start)
+    np.multiply(t[None, :], -np.asarray(rate, dtype=DTYPE)[:, None], out=out)
+    np.exp(out, out=out)
+    return out
+
+
+class BatchMixer:
+    """二维 float32 混音器，每行是一个变体，lengths 为每个变体的采样数"""
+
+    def __init__(self, lengths, sample_rate):
+        self.lengths = np.asarray(lengths, dtype=int)
+        self.rows = len(self.lengths)
+        self.n = int(self.lengths.max())
+        self.sample_rate = sample_rate
+        self.buffer = np.zeros((self.rows, self.n), dtype=DTYPE)
+        self._scratch = []
+
+    def scratch(self, index=0, length=None):
+        """返回第 index 个可复用的 (变体数 × length) 临时缓冲区（内容未清零）"""
+        while len(self._scratch) <= index:
+            self._scratch.append(np.empty((self.rows, self.n), dtype=DTYPE))
+        return self._scratch[index][:, :self.n if length is None else length]
+
+    def add(self, signal, gain=1.0, offset=0):
+        """把 signal 按行乘以 gain 后累加到 offset 处，gain 不为 1 时会原地缩放 signal"""
+        view = self.buffer[:, offset:offset + signal.shape[1]]
+        signal = signal[:, :view.shape[1]]
+        if np.ndim(gain) or gain != 1.0:
+            np.multiply(signal, np.asarray(gain, dtype=DTYPE).reshape(-1, 1), out=signal)
+        np.add(view, signal, out=view)
+        return self
+
+    def multiply(self, signal, offset=0):
+        """把 offset 处的一段混音按行乘以 signal"""
+        view = self.buffer[:, offset:offset + signal.shape[1]]
+        np.multiply(view, signal[:, :view.shape[1]], out=view)
+        return self
+
+    def add_sine(self, freq, gain=1.0, offset=0, length=None, envelope=None, phase0=None):
+        """在 offset 处为每行叠加一个正弦波，freq、gain、phase0 可以是每行一个值"""
+        if length is None:
+            length = self.n - offset
+        length = min(length, self.n - offset)
+        if length <= 0:
+            return self
+        freq = np.broadcast_to(np.asarray(freq, dtype=float), (self.rows,))
+        tone = batch_sine(freq, length, self.sample_rate, self.scratch(0, length), phase0=phase0)
+        if envelope is not None:
+            np.multiply(tone, envelope[:, :length], out=tone)
+        return self.add(tone, gain, offset)
+
+    def trim(self):
+        """把每行超出自身长度的部分清零，之后的标准化只看有效采样"""
+        self.buffer[np.arange(self.n)[None, :] >= self.lengths[:, None]] = 0
+        return self
+
+    def normalize(self, level):
+        """按行把峰值缩放到 level"""
+        self.trim()
+        peak = np.maximum(self.buffer.max(axis=1), -self.buffer.min(axis=1))
+        scale = np.divide(level, peak, out=np.zeros_like(peak), where=peak > 0)
+        np.multiply(self.buffer, scale[:, None], out=self.buffer)
+        return self.buffer
+
+    def to_int16(self, level):
+        """按行标准化并转换为 int16，返回 (二维 int16 数组, 每行有效长度)"""
+        self.normalize(level)
+        np.multiply(self.buffer, DTYPE(32767), out=self.buffer)
+        return self.buffer.astype(np.int16), self.lengths
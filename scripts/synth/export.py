@@ -0,0 +1,138 @@
+"""导出配置：格式、采样率和位深
+
+每个提醒音只以 44.1 kHz float32 渲染一次母版，各导出配置从母版派生：
+低采样率用 resample_poly 多相重采样，同一采样率的重采样结果在配置之间复用。
+FLAC / Ogg 编码需要可选依赖 soundfile。编码在内存中完成，写出由 writer 模块原子地进行。
+libsndfile 为每个 Ogg 流随机选取流序列号且不提供固定它的接口，因此同一母版每次编码出的 Ogg 文件
+字节不同（解码后的音频相同）；WAV / FLAC 的输出是确定的。
+"""
+import io
+import math
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+from . import trace
+from .oscillator import DTYPE
+from .writer import write_atomic
+
+# 各位深对应的 numpy 类型和满幅值，与原来的 np.int16(x * 32767) 一致，向零截断
+_PCM_TYPES = {
+    8: (np.uint8, 127),
+    16: (np.int16, 32767),
+    32: (np.int32, 2147483647),
+}
+
+
+class ExportProfile(NamedTuple):
+    """一种导出配置：format 为 wav / flac / ogg，bits 为整数位深（ogg 忽略），subdir 为相对输出目录的子目录"""
+    format: str
+    sample_rate: int
+    bits: int = 16
+    subdir: str = ""
+
+    @property
+    def extension(self):
+        return "." + self.format
+
+    def path(self, directory, name):
+        return os.path.join(directory, self.subdir, name + self.extension)
+
+
+PROFILES = {
+    # 与打包进应用的 WAV 完全一致
+    "release": ExportProfile("wav", 44100, 16),
+    "flac": ExportProfile("flac", 44100, 16, "flac"),
+    # 面向低端机器和安装包体积：22.05 kHz Ogg Vorbis
+    "compact": ExportProfile("ogg", 22050, 16, "compact"),
+    "lowend": ExportProfile("wav", 22050, 16, "lowend"),
+}
+
+
+def _soundfile():
+    try:
+        import soundfile
+    except ImportError:
+        raise RuntimeError("导出 FLAC / Ogg 需要安装 soundfile：pip install soundfile") from None
+    return soundfile
+
+
+@trace.traced("resample", "convert")
+def resample(samples, src_rate, dst_rate):
+    """多相重采样，src_rate 与 dst_rate 之比化为最简整数比"""
+    if src_rate == dst_rate:
+        return samples
+    from scipy import signal
+
+    g = math.gcd(int(src_rate), int(dst_rate))
+    out = signal.resample_poly(samples, dst_rate // g, src_rate // g)
+    return out.astype(DTYPE, copy=False)
+
+
+@trace.traced("to_pcm", "convert")
+def to_pcm(samples, bits):
+    """把 [-1, 1] 范围的 float 采样转换为整数 PCM（8 位为无符号）
+
+    超出范围的采样（例如重采样在峰值附近的过冲）先截到满幅，不会在转换整数时溢出回绕。
+    """
+    if bits not in _PCM_TYPES:
+        raise ValueError(f"不支持的位深 {bits}，可选: {sorted(_PCM_TYPES)}")
+    dtype, full_scale = _PCM_TYPES[bits]
+    # 32 位的满幅值超出 float32 的精确整数范围，用 float64 计算
+    scaled = np.multiply(samples, full_scale, dtype=DTYPE if bits < 32 else np.float64)
+    np.clip(scaled, -full_scale, full_scale, out=scaled)
+    if bits == 8:
+        np.add(scaled, 128, out=scaled)
+    return scaled.astype(dtype)
+
+
+class MasterRender:
+    """一次渲染的母版，按采样率缓存重采样结果，供多个导出配置复用"""
+
+    def __init__(self, samples, sample_rate):
+        self.sample_rate = sample_rate
+        self._rates = {sample_rate: samples}
+
+    @property
+    def samples(self):
+        return self._rates[self.sample_rate]
+
+    def at_rate(self, sample_rate):
+        if sample_rate not in self._rates:
+            self._rates[sample_rate] = resample(self.samples, self.sample_rate, sample_rate)
+        return self._rates[sample_rate]
+
+    def encode(self, profile):
+        """按 profile 把母版编码为完整的文件内容（bytes）"""
+        samples = self.at_rate(profile.sample_rate)
+        buffer = io.BytesIO()
+        with trace.stage("encode", "convert", format=profile.format):
+            if profile.format == "wav":
+                from scipy.io import wavfile
+
+                wavfile.write(buffer, profile.sample_rate, to_pcm(samples, profile.bits))
+            elif profile.format == "flac":
+                subtype = {16: "PCM_16", 24: "PCM_24"}.get(profile.bits)
+                if subtype is None:
+                    raise ValueError("FLAC 只支持 16 或 24 位")
+                _soundfile().write(buffer, np.clip(samples, -1, 1), profile.sample_rate,
+                                   format="FLAC", subtype=subtype)
+            elif profile.format == "ogg":
+                # 流序列号随机，输出字节每次不同，见模块说明
+                _soundfile().write(buffer, samples, profile.sample_rate, format="OGG", subtype="VORBIS")
+            else:
+                raise ValueError(f"不支持的导出格式 {profile.format}")
+        return buffer.getvalue()
+
+    def export(self, profile, path, writer=None):
+        """按 profile 把母版原子地写入 path（内容未变时跳过），返回 path
+
+        writer 为 FileWriter 时交给其 I/O 线程池在后台写出，调用方在 writer 关闭后才能读取文件。
+        """
+        data = self.encode(profile)
+        if writer is not None:
+            writer.submit(path, data)
+        else:
+            write_atomic(path, data)
+        return path
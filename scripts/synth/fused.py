@@ -0,0 +1,263 @@
+"""融合求值的信号图
+
+exp_decay(4) * exp_rise(25) 这样的包络用振荡器模块逐个计算时，每个中间结果都是一个完整长度的
+缓冲区，每一步运算都要把整段数据读写一遍。这里先用运算符把振荡器、包络和增益组合成信号图，
+evaluate() 再按 BLOCK 分块，每块从叶子（时间轴、正弦、已有采样）算到根，中间结果都是留在缓存里的小块，
+最后直接写入、累加或乘进输出缓冲区，整段数据只经过一次。
+
+默认按原地 ufunc 链逐块计算，与 oscillator 中对应函数的 float32 运算顺序相同，结果逐位一致。
+设置环境变量 SYNTH_FUSED=numexpr 且安装了 numexpr 时，每块的逐元素运算交给 numexpr 一次完成，
+结果与 ufunc 链相差约 1 ULP。NumPy 的 float32 exp / sin 已经是 SIMD 实现，而不带 VML 的 numexpr
+逐元素调用 libm，实测 exp 慢约 5 倍，所以 numexpr 只在带 VML 的构建上值得开启。numexpr 只在第一次求值时才导入。
+"""
+import importlib.util
+import os
+
+import numpy as np
+
+from . import trace
+from .oscillator import BLOCK as PHASE_BLOCK, DTYPE, TWO_PI
+
+BACKEND = ("numexpr" if os.environ.get("SYNTH_FUSED", "") == "numexpr"
+           and importlib.util.find_spec("numexpr") is not None else "numpy")
+
+# 每块 32768 个采样（128 KB），一个信号图的几个中间结果能同时留在 L2 缓存中；
+# 必须是 oscillator.BLOCK 的整数倍
+BLOCK = 8 * PHASE_BLOCK
+
+_BINARY = {"add": (np.add, "+"), "sub": (np.subtract, "-"), "mul": (np.multiply, "*")}
+
+
+class Expr:
+    """信号图的节点，用 + - * 与其他节点或常数组合，evaluate() 时才计算"""
+
+    __slots__ = ("op", "args")
+
+    def __init__(self, op, *args):
+        self.op = op
+        self.args = args
+
+    def __add__(self, other):
+        return Expr("add", self, _node(other))
+
+    def __radd__(self, other):
+        return Expr("add", _node(other), self)
+
+    def __sub__(self, other):
+        return Expr("sub", self, _node(other))
+
+    def __rsub__(self, other):
+        return Expr("sub", _node(other), self)
+
+    def __mul__(self, other):
+        return Expr("mul", self, _node(other))
+
+    def __rmul__(self, other):
+        return Expr("mul", _node(other), self)
+
+    def __neg__(self):
+        return Expr("mul", self, Expr("const", -1.0))
+
+
+def _node(value):
+    return value if isinstance(value, Expr) else Expr("const", float(value))
+
+
+def time_axis(start=0.0):
+    """时间轴 t = start + k / sample_rate"""
+    return Expr("time", float(start))
+
+
+def sine(freq, amp=1.0, phase0=0.0):
+    """标量频率的正弦振荡器，phase0 为起始相位（以周期为单位）"""
+    return Expr("sine", float(freq), float(amp), float(phase0))
+
+
+def signal(samples):
+    """已经算好的采样（噪声、扫频音等），长度不小于求值的采样数"""
+    return Expr("signal", samples)
+
+
+def exp(x):
+    return Expr("exp", _node(x))
+
+
+def square(x):
+    return Expr("square", _node(x))
+
+
+def exp_decay(rate, start=0.0):
+    """指数衰减包络 exp(-rate * (t + start))"""
+    return exp(time_axis(start) * -rate)
+
+
+def exp_rise(rate, start=0.0):
+    """指数起音包络 1 - exp(-rate * (t + start))"""
+    return 1.0 - exp_decay(rate, start)
+
+
+class _Block:
+    """一次求值共用的块缓冲区池，以及当前块内时间轴和相位角的计算"""
+
+    def __init__(self, sample_rate, capacity):
+        self.sample_rate = sample_rate
+        self.steps = np.arange(capacity, dtype=DTYPE)
+        self._free = []
+        self.begin = 0
+        self.size = 0
+
+    def take(self):
+        """取一个块缓冲区，返回当前块长度的视图"""
+        full = self._free.pop() if self._free else np.empty(len(self.steps), dtype=DTYPE)
+        return full[:self.size]
+
+    def give(self, buf):
+        self._free.append(buf.base)
+
+    def time(self, start):
+        """块内的时间轴，与 oscillator.time_axis 的运算顺序相同"""
+        out = self.take()
+        np.add(self.steps[:self.size], DTYPE(self.begin), out=out)
+        np.multiply(out, DTYPE(1.0 / self.sample_rate), out=out)
+        if start:
+            np.add(out, DTYPE(start), out=out)
+        return out
+
+    def angle(self, freq, phase0):
+        """块内的相位角 2π·phase，与 oscillator.sine 相同：按 oscillator.BLOCK 分段，段起点相位用 float64 计算"""
+        inc = freq / self.sample_rate
+        chunks = -(-self.size // PHASE_BLOCK)
+        starts = self.begin + PHASE_BLOCK * np.arange(chunks)
+        offsets = ((phase0 + starts * inc) % 1.0).astype(DTYPE)
+        out = self.take()
+        work = self.take()
+        scaled = work.base[:PHASE_BLOCK]
+        np.multiply(self.steps[:PHASE_BLOCK], DTYPE(inc), out=scaled)
+        segments = out.base[:chunks * PHASE_BLOCK].reshape(chunks, PHASE_BLOCK)
+        np.add(scaled, offsets[:, None], out=segments)
+        np.floor(out, out=work)
+        np.subtract(out, work, out=out)
+        self.give(work)
+        np.multiply(out, DTYPE(TWO_PI), out=out)
+        return out
+
+
+def _eval_numpy(node, block):
+    """逐块计算 node，返回块缓冲区（常数返回 DTYPE 标量）"""
+    op, args = node.op, node.args
+    if op == "const":
+        return DTYPE(args[0])
+    if op == "time":
+        return block.time(args[0])
+    if op == "signal":
+        out = block.take()
+        np.copyto(out, args[0][block.begin:block.begin + block.size])
+        return out
+    if op == "sine":
+        freq, amp, phase0 = args
+        out = block.angle(freq, phase0)
+        np.sin(out, out=out)
+        if amp != 1.0:
+            np.multiply(out, DTYPE(amp), out=out)
+        return out
+    if op in ("exp", "square"):
+        out = _eval_numpy(args[0], block)
+        if not isinstance(out, np.ndarray):
+            return DTYPE(np.exp(out) if op == "exp" else np.square(out))
+        (np.exp if op == "exp" else np.square)(out, out=out)
+        return out
+    ufunc = _BINARY[op][0]
+    left = _eval_numpy(args[0], block)
+    right = _eval_numpy(args[1], block)
+    if isinstance(left, np.ndarray):
+        ufunc(left, right, out=left)
+        if isinstance(right, np.ndarray):
+            block.give(right)
+        return left
+    if isinstance(right, np.ndarray):
+        ufunc(left, right, out=right)
+        return right
+    return DTYPE(ufunc(left, right))
+
+
+def _compile(node, leaves):
+    """把 node 写成 numexpr 表达式，常数、时间轴、相位角和采样作为变量放进 leaves"""
+    op, args = node.op, node.args
+    if op == "const":
+        leaves.append(("const", DTYPE(args[0])))
+    elif op in ("time", "sine", "signal"):
+        leaves.append((op, args))
+    else:
+        inner = [_compile(arg, leaves) for arg in args]
+        if op == "exp":
+            return f"exp({inner[0]})"
+        if op == "square":
+            return f"({inner[0]} ** 2)"
+        return f"({inner[0]} {_BINARY[op][1]} {inner[1]})"
+    name = f"v{len(leaves) - 1}"
+    if op == "sine":
+        return f"(sin({name}) * c{len(leaves) - 1})" if args[1] != 1.0 else f"sin({name})"
+    return name
+
+
+def _eval_numexpr(expr, leaves, block, target, combine):
+    import numexpr
+
+    local = {}
+    taken = []
+    for i, (kind, value) in enumerate(leaves):
+        if kind == "const":
+            local[f"v{i}"] = value
+        elif kind == "time":
+            local[f"v{i}"] = block.time(value[0])
+            taken.append(local[f"v{i}"])
+        elif kind == "signal":
+            local[f"v{i}"] = value[0][block.begin:block.begin + block.size]
+        else:
+            local[f"v{i}"] = block.angle(value[0], value[2])
+            local[f"c{i}"] = DTYPE(value[1])
+            taken.append(local[f"v{i}"])
+    if combine is not None:
+        local["o"] = target
+        expr = f"o {'+' if combine == 'add' else '*'} {expr}"
+    numexpr.evaluate(expr, local_dict=local, out=target, casting="same_kind")
+    for buf in taken:
+        block.give(buf)
+
+
+@trace.traced("evaluate", "fused")
+def evaluate(expr, n, sample_rate, out=None, combine=None):
+    """分块计算信号图 expr 的 n 个采样
+
+    combine 为 None 时把结果写入 out，为 "add" / "multiply" 时累加或乘进 out 已有的内容。
+    """
+    if combine not in (None, "add", "multiply"):
+        raise ValueError(f"未知的合并方式: {combine}")
+    if out is None:
+        trace.alloc(n * np.dtype(DTYPE).itemsize)
+        out = np.zeros(n, dtype=DTYPE) if combine else np.empty(n, dtype=DTYPE)
+    elif len(out) != n:
+        raise ValueError(f"输出缓冲区长度 {len(out)} 与所需长度 {n} 不一致")
+    expr = _node(expr)
+    # 相位按 oscillator.BLOCK 整段计算，块缓冲区的长度取整段的整数倍
+    block = _Block(sample_rate, min(BLOCK, -(-n // PHASE_BLOCK) * PHASE_BLOCK))
+    if BACKEND == "numexpr":
+        leaves = []
+        source = _compile(expr, leaves)
+    for begin in range(0, n, BLOCK):
+        block.begin = begin
+        block.size = min(BLOCK, n - begin)
+        target = out[begin:begin + block.size]
+        if BACKEND == "numexpr":
+            _eval_numexpr(source, leaves, block, target, combine)
+            continue
+        value = _eval_numpy(expr, block)
+        if combine == "add":
+            np.add(target, value, out=target)
+        elif combine == "multiply":
+            np.multiply(target, value, out=target)
+        else:
+            target[...] = value
+        if isinstance(value, np.ndarray):
+            block.give(value)
+    return out
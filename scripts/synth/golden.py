@@ -0,0 +1,90 @@
+"""黄金输出回归检查
+
+把当前渲染结果与保存的参考 PCM 逐块比较，报告最大绝对误差（以 16 位 LSB 为单位）、
+信噪比和对数谱距离，任何一项超出容差即判为失败。参考 PCM 以 atlas 格式保存，
+读取时 mmap 整个文件，每次只把当前块读进内存，比较的开销与渲染本身相当。
+"""
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+# 逐块比较的块大小（采样数），必须是 SPECTRUM_FFT 的整数倍
+GOLDEN_BLOCK = 1 << 16
+
+# 对数谱距离使用的 FFT 帧长，以及低于满幅多少 dB 的频谱分量不计入距离
+SPECTRUM_FFT = 2048
+SPECTRUM_FLOOR_DB = -100.0
+
+
+class Tolerance(NamedTuple):
+    """回归容差：最大绝对误差（LSB）、最低信噪比（dB）、最大对数谱距离（dB）"""
+    max_abs: int = 2
+    min_snr_db: float = 60.0
+    max_lsd_db: float = 1.0
+
+
+class Comparison(NamedTuple):
+    """一个提醒音的比较结果，长度不一致时其余指标只覆盖重叠部分"""
+    length: int
+    reference_length: int
+    max_abs: int
+    snr_db: float
+    lsd_db: float
+
+    def failures(self, tolerance):
+        """返回超出容差的项目说明列表，空列表表示通过"""
+        failed = []
+        if self.length != self.reference_length:
+            failed.append(f"长度 {self.length} != 参考 {self.reference_length}")
+        if self.max_abs > tolerance.max_abs:
+            failed.append(f"最大误差 {self.max_abs} LSB > {tolerance.max_abs}")
+        if self.snr_db < tolerance.min_snr_db:
+            failed.append(f"信噪比 {self.snr_db:.1f} dB < {tolerance.min_snr_db:g}")
+        if self.lsd_db > tolerance.max_lsd_db:
+            failed.append(f"谱距离 {self.lsd_db:.3f} dB > {tolerance.max_lsd_db:g}")
+        return failed
+
+
+def _log_spectra(frames, window):
+    spectrum = np.abs(np.fft.rfft(frames * window, axis=1))
+    # 以满幅正弦的峰值为 0 dB
+    np.multiply(spectrum, 2 / (32768.0 * window.sum()), out=spectrum)
+    np.maximum(spectrum, 10 ** (SPECTRUM_FLOOR_DB / 20), out=spectrum)
+    return 20 * np.log10(spectrum)
+
+
+def compare_pcm(reference, samples, block=GOLDEN_BLOCK):
+    """逐块比较 16 位 PCM：reference 可以是 np.memmap 视图，samples 为当前渲染的 int16 采样"""
+    n = min(len(reference), len(samples))
+    window = np.hanning(SPECTRUM_FFT)
+    max_abs = 0
+    signal_energy = 0.0
+    error_energy = 0.0
+    lsd_total = 0.0
+    frames = 0
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        ref = np.asarray(reference[start:stop], dtype=np.float64)
+        cur = np.asarray(samples[start:stop], dtype=np.float64)
+        err = cur - ref
+        max_abs = max(max_abs, int(np.max(np.abs(err))))
+        signal_energy += float(np.dot(ref, ref))
+        error_energy += float(np.dot(err, err))
+
+        # 按 SPECTRUM_FFT 分帧（末尾补零），逐帧计算对数谱的 RMS 差
+        count = -(-len(ref) // SPECTRUM_FFT)
+        pair = np.zeros((2, count * SPECTRUM_FFT))
+        pair[0, :len(ref)] = ref
+        pair[1, :len(cur)] = cur
+        spectra = _log_spectra(pair.reshape(2 * count, SPECTRUM_FFT), window).reshape(2, count, -1)
+        lsd_total += float(np.sum(np.sqrt(np.mean(np.square(spectra[1] - spectra[0]), axis=1))))
+        frames += count
+
+    if error_energy == 0:
+        snr_db = math.inf
+    elif signal_energy == 0:
+        snr_db = -math.inf
+    else:
+        snr_db = 10 * math.log10(signal_energy / error_energy)
+    return Comparison(len(samples), len(reference), max_abs, snr_db, lsd_total / frames if frames else 0.0)
@@ -0,0 +1,176 @@
+"""逐采样循环内核：Numba 后端与纯 NumPy 后备实现
+
+带反馈的效果（梳状滤波、全通延迟、一阶平滑）和带颤音的相位累加本质上是逐采样的递推，
+用 NumPy 只能分块绕开，并且要创建额外的临时数组。默认使用 NumPy 实现；设置环境变量
+SYNTH_KERNELS=numba 且安装了 Numba 时，这些循环被编译为本地代码。两者按相同的 float32 运算顺序编写，
+但 Numba 后端没有纳入黄金输出检查，开启后应先用 --verify 确认输出与参考一致。
+
+所有内核都只处理一维 float32 数组。Numba 只在第一次调用内核时才导入和编译，不影响本包的导入速度。
+"""
+import importlib.util
+import os
+
+import numpy as np
+
+BACKEND = ("numba" if os.environ.get("SYNTH_KERNELS", "") == "numba"
+           and importlib.util.find_spec("numba") is not None else "numpy")
+
+_compiled = {}
+
+
+def _numba(name):
+    """返回编译好的 Numba 循环，首次调用时才导入 numba"""
+    if name not in _compiled:
+        import numba
+
+        _compiled[name] = numba.njit(cache=True, nogil=True)(_LOOPS[name])
+    return _compiled[name]
+
+
+def _output(x, out):
+    if out is None:
+        return np.empty(len(x), dtype=x.dtype)
+    if len(out) != len(x):
+        raise ValueError(f"输出缓冲区长度 {len(out)} 与输入长度 {len(x)} 不一致")
+    return out
+
+
+# 以下循环是各内核的逐采样定义，Numba 后端直接编译它们，NumPy 后备实现按相同的运算顺序编写
+
+def _accumulate_phase_loop(out, phase0, block):
+    n = out.shape[0]
+    carry = phase0
+    for start in range(0, n, block):
+        end = min(start + block, n)
+        acc = np.float32(0.0)
+        offset = np.float32(carry)
+        for i in range(start, end):
+            acc = acc + out[i]
+            out[i] = acc + offset
+        carry = float(out[end - 1]) % 1.0
+    for i in range(n):
+        out[i] = out[i] - np.floor(out[i])
+
+
+def _comb_loop(x, delay, gain, out):
+    for i in range(x.shape[0]):
+        if i >= delay:
+            out[i] = x[i] + gain * out[i - delay]
+        else:
+            out[i] = x[i]
+
+
+def _allpass_loop(x, delay, gain, out):
+    neg_gain = -gain
+    for i in range(x.shape[0]):
+        v = neg_gain * x[i]
+        if i >= delay:
+            v = v + x[i - delay]
+            v = v + gain * out[i - delay]
+        out[i] = v
+
+
+def _one_pole_loop(x, coeff, feedback, state, out):
+    y = state
+    for i in range(x.shape[0]):
+        y = coeff * x[i] + feedback * y
+        out[i] = y
+    return y
+
+
+_LOOPS = {
+    "accumulate_phase": _accumulate_phase_loop,
+    "comb": _comb_loop,
+    "allpass": _allpass_loop,
+    "one_pole": _one_pole_loop,
+}
+
+
+def accumulate_phase(out, block, phase0=0.0):
+    """原地把 float32 的每采样相位增量（以周期为单位）累加为落在 [0, 1) 内的相位
+
+    每 block 个采样把累加值回绕一次，float32 累加误差不会随长度增长。
+    """
+    if BACKEND == "numba":
+        _numba("accumulate_phase")(out, float(phase0), block)
+        return out
+    carry = phase0
+    for start in range(0, len(out), block):
+        view = out[start:start + block]
+        np.cumsum(view, out=view)
+        np.add(view, np.float32(carry), out=view)
+        carry = float(view[-1]) % 1.0
+    whole = np.empty(min(len(out), block), dtype=out.dtype)
+    for start in range(0, len(out), block):
+        view = out[start:start + block]
+        np.floor(view, out=whole[:len(view)])
+        np.subtract(view, whole[:len(view)], out=view)
+    return out
+
+
+def comb(x, delay, gain, out=None):
+    """反馈梳状滤波 y[n] = x[n] + gain * y[n - delay]，out 可以就是 x（原地计算）"""
+    out = _output(x, out)
+    gain = np.float32(gain)
+    if BACKEND == "numba":
+        _numba("comb")(x, delay, gain, out)
+        return out
+    # 每一段 delay 个采样只依赖上一段的输出，可以整段向量化
+    n = len(x)
+    out[:delay] = x[:delay]
+    feedback = np.empty(min(delay, max(n - delay, 0)), dtype=x.dtype)
+    for start in range(delay, n, delay):
+        end = min(start + delay, n)
+        fb = feedback[:end - start]
+        np.multiply(out[start - delay:end - delay], gain, out=fb)
+        np.add(x[start:end], fb, out=out[start:end])
+    return out
+
+
+def allpass(x, delay, gain, out=None):
+    """Schroeder 全通延迟 y[n] = -gain * x[n] + x[n - delay] + gain * y[n - delay]
+
+    需要读取 delay 个采样之前的输入，out 不能与 x 共用内存。
+    """
+    out = _output(x, out)
+    if np.shares_memory(x, out):
+        raise ValueError("allpass 的输出缓冲区不能与输入共用内存")
+    gain = np.float32(gain)
+    if BACKEND == "numba":
+        _numba("allpass")(x, delay, gain, out)
+        return out
+    n = len(x)
+    neg_gain = -gain
+    np.multiply(x[:delay], neg_gain, out=out[:delay])
+    feedback = np.empty(min(delay, max(n - delay, 0)), dtype=x.dtype)
+    for start in range(delay, n, delay):
+        end = min(start + delay, n)
+        view = out[start:end]
+        fb = feedback[:end - start]
+        np.multiply(x[start:end], neg_gain, out=view)
+        np.add(view, x[start - delay:end - delay], out=view)
+        np.multiply(out[start - delay:end - delay], gain, out=fb)
+        np.add(view, fb, out=view)
+    return out
+
+
+def one_pole(x, coeff, out=None, state=0.0):
+    """一阶平滑 y[n] = coeff * x[n] + (1 - coeff) * y[n - 1]，y[-1] = state，out 可以就是 x
+
+    返回 (输出, 最后一个输出值)，后者可以作为下一块的 state。
+    """
+    out = _output(x, out)
+    coeff = np.float32(coeff)
+    feedback = np.float32(1) - coeff
+    if BACKEND == "numba":
+        last = _numba("one_pole")(x, coeff, feedback, np.float32(state), out)
+        return out, float(last)
+    from scipy import signal
+
+    # lfilter 的直接 II 型转置结构对 float32 输入同样按 coeff * x + feedback * y 逐采样递推
+    b = np.array([coeff], dtype=np.float32)
+    a = np.array([1, -feedback], dtype=np.float32)
+    zi = np.array([feedback * np.float32(state)], dtype=np.float32)
+    y, _ = signal.lfilter(b, a, x, zi=zi)
+    out[...] = y
+    return out, float(out[-1]) if len(out) else float(state)
@@ -0,0 +1,35 @@
+"""可无缝循环的环境音
+
+周期性的环境音只需要渲染一个循环：时长取调制信号的整数个周期，音调频率微调为在循环内
+恰好整数个周期，噪声使用以循环长度为周期的噪声表（见 noise），循环的末尾和开头在波形和
+频谱上都是连续的。
+"""
+import math
+from fractions import Fraction
+
+import numpy as np
+
+
+def loop_length(duration, mod_freq, sample_rate):
+    """最接近 duration 的、恰好是整数个调制周期的采样数，至少一个这样的长度
+
+    周期的采样数 sample_rate / mod_freq 不是整数时（例如 11025 Hz 下的 4 Hz），
+    取其分母个周期作为最小单位，循环点上调制信号的相位仍然精确衔接。
+    """
+    period = Fraction(sample_rate) / Fraction(mod_freq).limit_denominator(1000)
+    step = period.denominator
+    periods = max(step, round(duration * mod_freq / step) * step)
+    return int(period * periods)
+
+
+def loop_frequency(freq, n, sample_rate):
+    """把 freq 微调为在 n 个采样内恰好整数个周期，偏差不超过半个周期 / 循环时长"""
+    seconds = n / sample_rate
+    return max(1, round(freq * seconds)) / seconds
+
+
+def seam_jump(samples):
+    """循环点处首尾样本差相对相邻样本差的典型值（RMS）之比，接近 1 说明衔接处与其他地方一样平滑"""
+    samples = np.asarray(samples, dtype=np.float64)
+    typical = math.sqrt(float(np.mean(np.square(np.diff(samples)))))
+    return abs(samples[0] - samples[-1]) / typical if typical else 0.0
@@ -0,0 +1,120 @@
+"""预分配混音缓冲区
+
+每个提醒音只分配一个 float32 混音缓冲区和少量可复用的临时缓冲区，
+振荡器和包络通过 out= 写入临时缓冲区，再原地累加到混音缓冲区，
+直到最后的 int16 转换。
+"""
+import numpy as np
+
+from . import trace
+from .additive import additive
+from .fused import evaluate
+from .oscillator import DTYPE, sine
+
+
+class Mixer:
+    """float32 混音器，所有累加、乘法和标准化都原地完成"""
+
+    def __init__(self, n, sample_rate):
+        self.n = n
+        self.sample_rate = sample_rate
+        self.buffer = np.zeros(n, dtype=DTYPE)
+        trace.alloc(self.buffer.nbytes)
+        self._scratch = []
+
+    def scratch(self, index=0, length=None):
+        """返回第 index 个可复用的临时缓冲区（内容未清零），length 指定所需长度"""
+        while len(self._scratch) <= index:
+            self._scratch.append(np.empty(self.n, dtype=DTYPE))
+            trace.alloc(self._scratch[-1].nbytes)
+        return self._scratch[index][:self.n if length is None else length]
+
+    def _span(self, offset, length):
+        return self.buffer[offset:offset + length]
+
+    def add(self, signal, gain=1.0, offset=0):
+        """把 signal 乘以 gain 后累加到 offset 处，超出缓冲区的部分被截断
+
+        gain 不为 1 时会原地缩放 signal，调用方应传入临时缓冲区。
+        """
+        view = self._span(offset, len(signal))
+        signal = signal[:len(view)]
+        if gain != 1.0:
+            np.multiply(signal, DTYPE(gain), out=signal)
+        np.add(view, signal, out=view)
+        return self
+
+    def multiply(self, signal, offset=0):
+        """把 offset 处的一段混音乘以 signal（包络、调制）"""
+        view = self._span(offset, len(signal))
+        np.multiply(view, signal[:len(view)], out=view)
+        return self
+
+    def add_sine(self, freq, gain=1.0, offset=0, length=None, envelope=None, phase0=0.0):
+        """在 offset 处叠加一个正弦波，可选地先乘以 envelope
+
+        phase0 为起始相位（以周期为单位），用于延续绝对时间上的相位。
+        """
+        if length is None:
+            length = self.n - offset
+        length = min(length, self.n - offset)
+        if length <= 0:
+            return self
+        tone = sine(freq, length, self.sample_rate, out=self.scratch(0, length), phase0=phase0)
+        if envelope is not None:
+            np.multiply(tone, envelope[:length], out=tone)
+        return self.add(tone, gain, offset)
+
+    def add_partials(self, freq, partials, gain=1.0, offset=0, length=None, envelope=None, phase0=0.0, start=0.0):
+        """在 offset 处叠加一组分音（加性合成），可选地先乘以 envelope
+
+        partials 为 Partial 元组，phase0 为基频的起始相位，start 为分音额外衰减的时间偏移。
+        """
+        if length is None:
+            length = self.n - offset
+        length = min(length, self.n - offset)
+        if length <= 0:
+            return self
+        tone = additive(partials, freq, length, self.sample_rate, out=self.scratch(0, length),
+                        phase0=phase0, start=start)
+        if envelope is not None:
+            np.multiply(tone, envelope[:length], out=tone)
+        return self.add(tone, gain, offset)
+
+    def add_expr(self, expr, gain=1.0, offset=0, length=None):
+        """在 offset 处叠加信号图 expr（见 fused），分块一次求值后直接累加，不占用临时缓冲区"""
+        view = self._expr_span(offset, length)
+        if len(view):
+            evaluate(expr * gain if gain != 1.0 else expr, len(view), self.sample_rate, out=view, combine="add")
+        return self
+
+    def multiply_expr(self, expr, offset=0, length=None):
+        """把 offset 处的一段混音乘以信号图 expr（包络、调制），分块一次求值"""
+        view = self._expr_span(offset, length)
+        if len(view):
+            evaluate(expr, len(view), self.sample_rate, out=view, combine="multiply")
+        return self
+
+    def _expr_span(self, offset, length):
+        if length is None:
+            length = self.n - offset
+        return self._span(offset, max(0, min(length, self.n - offset)))
+
+    def peak(self):
+        """峰值绝对值，不创建 np.abs 的临时数组"""
+        return max(float(self.buffer.max()), -float(self.buffer.min()))
+
+    @trace.traced("normalize", "mix")
+    def normalize(self, level):
+        """原地把峰值缩放到 level"""
+        peak = self.peak()
+        if peak > 0:
+            np.multiply(self.buffer, DTYPE(level / peak), out=self.buffer)
+        return self.buffer
+
+    @trace.traced("to_int16", "convert")
+    def to_int16(self, level):
+        """标准化到 level 并转换为 int16 采样（向零截断，与 np.int16(x * 32767) 一致）"""
+        self.normalize(level)
+        np.multiply(self.buffer, DTYPE(32767), out=self.buffer)
+        return self.buffer.astype(np.int16)
@@ -0,0 +1,84 @@
+"""频域合成的彩色噪声表
+
+白噪声经过带通 / 低通滤波后的频谱就是白噪声的频谱乘以滤波器的幅频响应，不需要先生成时域噪声再滤波：
+直接生成随机相位的复高斯频谱，乘以颜色（粉红 1/√f、布朗 1/f）和频带的幅度响应，一次 irfft 得到噪声。
+这样得到的噪声表恰好以表长为周期，首尾相接无缝循环，没有滤波器的起止瞬态。
+
+噪声表按 (颜色, 频带, 种子, 长度, 采样率) 缓存，同一进程中重复渲染（变体池、常驻服务、基准）时
+噪声只是一次读取。缓存的表是只读的，调用方需要缩放时应通过 fused.signal 或写入其他缓冲区。
+"""
+import functools
+import math
+
+import numpy as np
+
+from . import trace
+from .effects import in_draft_mode
+from .oscillator import DTYPE
+
+# 各颜色噪声的幅度谱指数：幅度 ∝ f^(-指数)，功率谱为其平方
+NOISE_COLORS = {"white": 0.0, "pink": 0.5, "brown": 1.0}
+
+# 粉红 / 布朗噪声的幅度谱在此频率以下不再增长，避免极低频的隆隆声占据大部分能量
+NOISE_MIN_FREQ = 20.0
+
+
+def _color_gain(color, freqs, n):
+    """颜色的幅度谱，按 Parseval 权重归一化为与单位方差白噪声相同的总功率"""
+    exponent = NOISE_COLORS[color]
+    if not exponent:
+        return None
+    gain = np.maximum(freqs, NOISE_MIN_FREQ) ** -exponent
+    gain[0] = 0.0
+    # 实数信号的直流和奈奎斯特频点只出现一次，其他频点在负频率还有一份共轭
+    weights = np.full(len(freqs), 2.0)
+    weights[0] = 1.0
+    if n % 2 == 0:
+        weights[-1] = 1.0
+    power = np.dot(weights, np.square(gain))
+    if power:
+        gain *= math.sqrt(weights.sum() / power)
+    return gain
+
+
+@functools.lru_cache(maxsize=16)
+def _shape(color, band, n, sample_rate, draft):
+    """颜色和频带合起来的幅度谱（float32，长度 n // 2 + 1），与种子无关，变体之间共用；全通时返回 None"""
+    freqs = np.arange(n // 2 + 1) * (sample_rate / n)
+    gain = _color_gain(color, freqs, n)
+    if band is not None:
+        response = band.response(freqs, sample_rate)
+        gain = response if gain is None else gain * response
+    return None if gain is None else gain.astype(DTYPE)
+
+
+@functools.lru_cache(maxsize=32)
+def _table(color, band, seed, n, sample_rate, draft):
+    with trace.stage("noise_table", "noise", color=color, n=n):
+        bins = n // 2 + 1
+        # SFC64 比默认的 PCG64 更快，同一个种子总是得到同一张表
+        rng = np.random.Generator(np.random.SFC64(seed))
+        # 复高斯频谱：除直流和奈奎斯特频点（必须为实数）外实部和虚部的方差为 n / 2，irfft 后为单位方差白噪声
+        spectrum = rng.standard_normal(2 * bins, dtype=DTYPE).view(np.complex64)
+        spectrum *= DTYPE(math.sqrt(n / 2))
+        spectrum[0] = spectrum[0].real * DTYPE(math.sqrt(2))
+        if n % 2 == 0:
+            spectrum[-1] = spectrum[-1].real * DTYPE(math.sqrt(2))
+        gain = _shape(color, band, n, sample_rate, draft)
+        if gain is not None:
+            spectrum *= gain
+        table = np.fft.irfft(spectrum, n)
+        trace.alloc(table.nbytes)
+    table.setflags(write=False)
+    return table
+
+
+def noise_table(n, sample_rate, color="white", band=None, seed=0):
+    """长度为 n、以 n 为周期的 float32 噪声表（只读，按参数缓存）
+
+    color 为 NOISE_COLORS 中的颜色，未加频带时噪声为单位方差；band 为 Filter 时，频谱乘以该滤波器的
+    幅频响应，与把单位方差白噪声交给 band.apply 的结果统计上相同（草稿模式下同样使用更便宜的滤波设置）。
+    """
+    if color not in NOISE_COLORS:
+        raise ValueError(f"未知的噪声颜色 {color}，可选: {', '.join(NOISE_COLORS)}")
+    return _table(color, band, int(seed), int(n), sample_rate, in_draft_mode())
@@ -0,0 +1,117 @@
+"""float32 相位累加振荡器与包络
+
+所有函数都接受可选的 out= 参数，结果直接写入调用方预分配的缓冲区，
+避免为每一个正弦项、泛音和包络创建完整长度的 float64 临时数组。
+"""
+import numpy as np
+
+from . import trace
+from .kernels import accumulate_phase
+
+DTYPE = np.float32
+
+# 分块累加相位，块内偏移量足够小，float32 也能保持相位精度
+BLOCK = 4096
+
+TWO_PI = 2 * np.pi
+
+
+def _output(out, n):
+    if out is None:
+        trace.alloc(n * np.dtype(DTYPE).itemsize)
+        return np.empty(n, dtype=DTYPE)
+    if len(out) != n:
+        raise ValueError(f"输出缓冲区长度 {len(out)} 与所需长度 {n} 不一致")
+    return out
+
+
+def _fill_index(out):
+    """原地写入 0, 1, 2, ...，按块填充，不创建完整长度的临时数组"""
+    steps = np.arange(min(len(out), BLOCK), dtype=DTYPE)
+    for start in range(0, len(out), BLOCK):
+        block = out[start:start + BLOCK]
+        np.add(steps[:len(block)], DTYPE(start), out=block)
+    return out
+
+
+def _wrap(out):
+    """原地把相位回绕到 [0, 1)：x - floor(x)，比 np.mod 快一个数量级"""
+    whole = np.empty(min(len(out), BLOCK), dtype=DTYPE)
+    for start in range(0, len(out), BLOCK):
+        block = out[start:start + BLOCK]
+        np.floor(block, out=whole[:len(block)])
+        np.subtract(block, whole[:len(block)], out=block)
+    return out
+
+
+@trace.traced("time_axis", "oscillator")
+def time_axis(n, sample_rate, out=None, start=0.0):
+    """时间轴 t = start + k / sample_rate，等价于 np.linspace(0, n / sample_rate, n, False)"""
+    out = _output(out, n)
+    _fill_index(out)
+    np.multiply(out, DTYPE(1.0 / sample_rate), out=out)
+    if start:
+        np.add(out, DTYPE(start), out=out)
+    return out
+
+
+@trace.traced("phase", "oscillator")
+def phase(freq, n, sample_rate, out=None, phase0=0.0):
+    """以周期为单位、落在 [0, 1) 内的相位
+
+    freq 为标量时按 k * f / sample_rate 计算；freq 为长度 n 的数组（扫频、颤音）时
+    逐块累加瞬时频率，等价于 np.cumsum(freq) / sample_rate，但全程使用 float32
+    并在每块结束时回绕，累加误差不会随长度增长。
+    """
+    out = _output(out, n)
+    if np.ndim(freq) == 0:
+        inc = float(freq) / sample_rate
+        steps = np.arange(min(n, BLOCK), dtype=DTYPE)
+        np.multiply(steps, DTYPE(inc), out=steps)
+        for start in range(0, n, BLOCK):
+            block = out[start:start + BLOCK]
+            # 块起点的相位用 float64 标量精确计算
+            np.add(steps[:len(block)], DTYPE((phase0 + start * inc) % 1.0), out=block)
+    else:
+        np.multiply(freq, DTYPE(1.0 / sample_rate), out=out)
+        return accumulate_phase(out, BLOCK, phase0)
+    return _wrap(out)
+
+
+@trace.traced("sine", "oscillator")
+def sine(freq, n, sample_rate, out=None, amp=1.0, phase0=0.0):
+    """正弦振荡器，freq 可以是标量或逐采样的瞬时频率数组"""
+    out = phase(freq, n, sample_rate, out=out, phase0=phase0)
+    np.multiply(out, DTYPE(TWO_PI), out=out)
+    np.sin(out, out=out)
+    if amp != 1.0:
+        np.multiply(out, DTYPE(amp), out=out)
+    return out
+
+
+@trace.traced("exp_decay", "envelope")
+def exp_decay(rate, n, sample_rate, out=None, start=0.0):
+    """指数衰减包络 exp(-rate * (t + start))"""
+    out = time_axis(n, sample_rate, out=out, start=start)
+    np.multiply(out, DTYPE(-rate), out=out)
+    np.exp(out, out=out)
+    return out
+
+
+@trace.traced("exp_rise", "envelope")
+def exp_rise(rate, n, sample_rate, out=None, start=0.0):
+    """指数起音包络 1 - exp(-rate * (t + start))"""
+    out = exp_decay(rate, n, sample_rate, out=out, start=start)
+    np.subtract(DTYPE(1.0), out, out=out)
+    return out
+
+
+@trace.traced("ramp", "envelope")
+def ramp(begin, end, n, out=None):
+    """线性渐变，等价于 np.linspace(begin, end, n)"""
+    out = _output(out, n)
+    _fill_index(out)
+    if n > 1:
+        np.multiply(out, DTYPE((end - begin) / (n - 1)), out=out)
+    np.add(out, DTYPE(begin), out=out)
+    return out
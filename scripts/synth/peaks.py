@@ -0,0 +1,108 @@
+"""波形峰值摘要与频谱缩略图
+
+界面要画出提醒音的波形预览时，不需要读取和解码 WAV：渲染时顺便从内存中的采样计算
+多级分辨率的 (最小值, 最大值, RMS) 桶，和音频编辑器的概览波形一样，最细一级直接由采样
+reshape 后求出，更粗的级别由上一级每 PEAK_FACTOR 个桶合并得到。
+可选的频谱缩略图是按对数频带汇总的短时傅里叶变换幅度（dB），量化为 0~255。
+所有数值都量化为小整数，整组摘要可以直接写成 JSON 交给前端。
+"""
+import numpy as np
+
+# 最细一级每个桶的采样数，以及相邻两级之间的合并倍数和级数
+PEAK_BUCKET = 256
+PEAK_FACTOR = 4
+PEAK_LEVELS = 3
+
+# 频谱缩略图：FFT 长度、时间帧数、频带数和显示的动态范围（dB）
+THUMB_FFT = 1024
+THUMB_FRAMES = 64
+THUMB_BANDS = 32
+THUMB_RANGE_DB = 80.0
+THUMB_MIN_FREQ = 50.0
+
+
+def _peak_level(samples, bucket):
+    """最细一级：返回每桶的 (最小值, 最大值, 平方和)，末尾不足一桶的部分补零"""
+    count = -(-len(samples) // bucket)
+    padded = np.zeros(count * bucket, dtype=samples.dtype)
+    padded[:len(samples)] = samples
+    frames = padded.reshape(count, bucket)
+    return frames.min(axis=1), frames.max(axis=1), np.einsum("ij,ij->i", frames, frames, dtype=np.float64)
+
+
+def _merge(lo, hi, energy, factor):
+    """把相邻 factor 个桶合并为一个"""
+    count = -(-len(lo) // factor)
+    pad = count * factor - len(lo)
+    if pad:
+        lo = np.append(lo, np.zeros(pad, dtype=lo.dtype))
+        hi = np.append(hi, np.zeros(pad, dtype=hi.dtype))
+        energy = np.append(energy, np.zeros(pad))
+    return (lo.reshape(count, factor).min(axis=1), hi.reshape(count, factor).max(axis=1),
+            energy.reshape(count, factor).sum(axis=1))
+
+
+def peak_levels(samples, bucket=PEAK_BUCKET, factor=PEAK_FACTOR, levels=PEAK_LEVELS):
+    """多级峰值摘要，返回 [{"samples_per_bucket", "min", "max", "rms"}, ...]，从细到粗
+
+    min / max 量化为 -127~127 的整数，rms 量化为 0~127（满幅为 127）。
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    lo, hi, energy = _peak_level(samples, bucket)
+    result = []
+    size = bucket
+    for level in range(levels):
+        if level:
+            lo, hi, energy = _merge(lo, hi, energy, factor)
+            size *= factor
+        rms = np.sqrt(energy / size)
+        result.append({
+            "samples_per_bucket": size,
+            "min": np.round(np.clip(lo, -1, 1) * 127).astype(np.int8).tolist(),
+            "max": np.round(np.clip(hi, -1, 1) * 127).astype(np.int8).tolist(),
+            "rms": np.round(np.clip(rms, 0, 1) * 127).astype(np.int8).tolist(),
+        })
+    return result
+
+
+def spectrogram_thumbnail(samples, sample_rate, frames=THUMB_FRAMES, bands=THUMB_BANDS,
+                          n_fft=THUMB_FFT, range_db=THUMB_RANGE_DB):
+    """频谱缩略图：frames 个均匀分布的 Hann 窗 FFT 帧，按对数间隔的 bands 个频带取幅度最大值
+
+    返回 {"frames", "bands", "band_edges", "range_db", "data"}，data 为 bands 行 frames 列的
+    0~255 整数（行从低频到高频），0 对应峰值以下 range_db 及更低。
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    if len(samples) < n_fft:
+        samples = np.pad(samples, (0, n_fft - len(samples)))
+    starts = np.linspace(0, len(samples) - n_fft, frames).astype(np.intp)
+    windows = np.lib.stride_tricks.sliding_window_view(samples, n_fft)[starts]
+    spectrum = np.abs(np.fft.rfft(windows * np.hanning(n_fft).astype(np.float32), axis=1))
+
+    # 对数间隔的频带边界（FFT 频点序号），低频区相邻边界相同的频带合并
+    edges_hz = np.geomspace(THUMB_MIN_FREQ, sample_rate / 2, bands + 1)
+    edges = np.unique(np.clip(np.round(edges_hz * n_fft / sample_rate).astype(np.intp), 1, n_fft // 2))
+    banded = np.maximum.reduceat(spectrum, edges[:-1], axis=1)
+
+    db = 20 * np.log10(np.maximum(banded, 1e-12))
+    db -= db.max()
+    scaled = np.round(np.clip(db / range_db + 1, 0, 1) * 255).astype(np.uint8)
+    return {
+        "frames": int(scaled.shape[0]),
+        "bands": int(scaled.shape[1]),
+        "band_edges": (edges * sample_rate / n_fft).round(1).tolist(),
+        "range_db": range_db,
+        "data": scaled.T.tolist(),
+    }
+
+
+def summarize(samples, sample_rate, spectrogram=True):
+    """一个提醒音的完整预览摘要：时长、多级峰值，以及可选的频谱缩略图"""
+    summary = {
+        "sample_rate": int(sample_rate),
+        "length": len(samples),
+        "peaks": peak_levels(samples),
+    }
+    if spectrogram:
+        summary["spectrogram"] = spectrogram_thumbnail(samples, sample_rate)
+    return summary
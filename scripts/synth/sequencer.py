@@ -0,0 +1,85 @@
+"""稀疏音符事件序列器
+
+每个音符只在包络高于听阈（dB 下限）的区间内渲染，然后累加进混音缓冲区，
+开销与 音符数 × 音符长度 成正比，而不是 音符数 × 整段音效长度。
+音色中额外衰减相同的多个分音一次交给加性合成计算，而不是逐个分音调用正弦振荡器。
+"""
+import math
+from typing import NamedTuple, Tuple
+
+from . import trace
+from .oscillator import exp_decay
+
+# int16 的最小量化步长约为 -90.3 dBFS，低于它的部分写入文件后都是 0
+DEFAULT_FLOOR_DB = -90.0
+
+
+class Partial(NamedTuple):
+    """音色中的一个分音：频率倍数、相对幅度、相对主包络额外的衰减速率"""
+    ratio: float
+    amp: float = 1.0
+    extra_decay: float = 0.0
+
+
+class Envelope(NamedTuple):
+    """指数衰减包络 exp(-decay * (τ + start))，τ 为音符开始后的时间"""
+    decay: float
+    start: float = 0.0
+
+
+SINE = (Partial(1.0),)
+
+
+class Note(NamedTuple):
+    """一个音符事件
+
+    onset 为开始时间（秒），absolute_phase 为 True 时相位沿用整段的时间轴
+    （即 sin(2π f t)），否则从音符开始处的 0 相位起振。
+    """
+    onset: float
+    freq: float
+    envelope: Envelope
+    timbre: Tuple[Partial, ...] = SINE
+    gain: float = 1.0
+    absolute_phase: bool = False
+
+
+def active_length(decay, sample_rate, floor_db=DEFAULT_FLOOR_DB, start=0.0):
+    """指数包络从 exp(-decay * start) 衰减到 floor_db 以下所需的采样数"""
+    if decay <= 0:
+        return math.inf
+    seconds = (-floor_db / 20 * math.log(10)) / decay - start
+    return max(0, math.ceil(seconds * sample_rate))
+
+
+@trace.traced("render_notes", "sequencer")
+def render_notes(mix, notes, floor_db=DEFAULT_FLOOR_DB):
+    """把音符事件逐个渲染进 mix，只计算包络的有效区间"""
+    sample_rate = mix.sample_rate
+    for note in notes:
+        idx = int(note.onset * sample_rate)
+        if idx >= mix.n:
+            continue
+        # 额外衰减相同的分音共用有效区间，多于一个时一次交给加性合成
+        groups = {}
+        for partial in note.timbre:
+            groups.setdefault(partial.extra_decay, []).append(partial)
+        for extra_decay, partials in groups.items():
+            decay = note.envelope.decay + extra_decay
+            length = min(mix.n - idx, active_length(decay, sample_rate, floor_db, note.envelope.start))
+            if length <= 0:
+                continue
+            env = exp_decay(decay, length, sample_rate, out=mix.scratch(1, length),
+                            start=note.envelope.start)
+            if len(partials) > 1:
+                phase0 = note.freq * idx / sample_rate if note.absolute_phase else 0.0
+                timbre = tuple(partial._replace(extra_decay=0.0) for partial in partials)
+                mix.add_partials(note.freq, timbre, note.gain, offset=idx, length=length,
+                                 envelope=env, phase0=phase0)
+                continue
+            partial, = partials
+            freq = note.freq * partial.ratio
+            phase0 = freq * idx / sample_rate if note.absolute_phase else 0.0
+            mix.add_sine(freq, note.gain * partial.amp, offset=idx, length=length,
+                         envelope=env, phase0=phase0)
+    return mix
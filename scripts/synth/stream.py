@@ -0,0 +1,96 @@
+"""分块流式渲染
+
+长时间的环境音（例如一小时的专注背景音）不能整段放进内存：生成器按固定大小的块
+产出采样，滤波器使用带状态的因果 sosfilt，增益在渲染前预先算好，WAV 边生成边写入，
+内存占用与时长无关。
+"""
+import wave
+
+import numpy as np
+
+from .oscillator import DTYPE, ramp, sine
+
+# 每块的采样数
+STREAM_BLOCK = 1 << 14
+
+
+class StreamFilter:
+    """带状态的因果 SOS 滤波器，跨块保持 zi，逐块调用结果与整段一次滤波一致"""
+
+    def __init__(self, sos):
+        from scipy import signal
+
+        self.sos = np.asarray(sos)
+        self._sosfilt = signal.sosfilt
+        self.zi = np.zeros((self.sos.shape[0], 2))
+
+    def __call__(self, block):
+        out, self.zi = self._sosfilt(self.sos, block, zi=self.zi)
+        return out
+
+
+def noise_gain(sos, length=1 << 15):
+    """白噪声经过 sos 滤波后的 RMS 增益，即冲激响应能量的平方根"""
+    from scipy import signal
+
+    impulse = np.zeros(length)
+    impulse[0] = 1.0
+    return float(np.sqrt(np.sum(signal.sosfilt(sos, impulse) ** 2)))
+
+
+def tone_peak(partials, sample_rate, seconds=1.0):
+    """若干正弦分音 [(频率, 幅度), ...] 叠加后的峰值，取前 seconds 秒估计
+
+    和谐相关的分音很少同时达到峰值，直接把幅度相加会高估峰值，导致流式输出偏小声。
+    """
+    n = int(sample_rate * seconds)
+    total = np.zeros(n, dtype=DTYPE)
+    tone = np.empty(n, dtype=DTYPE)
+    for freq, amp in partials:
+        np.add(total, sine(freq, n, sample_rate, out=tone, amp=amp), out=total)
+    return max(float(total.max()), -float(total.min()))
+
+
+def block_ranges(n, block_size=STREAM_BLOCK):
+    """按块遍历 [0, n)，产出 (起点, 长度)"""
+    for start in range(0, n, block_size):
+        yield start, min(block_size, n - start)
+
+
+def apply_fades(block, start, n, fade_in, fade_out, scratch=None):
+    """对从 start 开始的一块原地施加整段的线性渐入（前 fade_in 个采样）和渐出（后 fade_out 个采样）
+
+    渐变与 np.linspace(0, 1, fade_in) / np.linspace(1, 0, fade_out) 逐采样一致。
+    """
+    length = len(block)
+    if scratch is None:
+        scratch = np.empty(length, dtype=DTYPE)
+    if fade_in > 1 and start < fade_in:
+        span = min(fade_in, start + length) - start
+        env = ramp(start / (fade_in - 1), (start + span - 1) / (fade_in - 1), span, out=scratch[:span])
+        np.multiply(block[:span], env, out=block[:span])
+    fade_start = n - fade_out
+    if fade_out > 1 and start + length > fade_start:
+        lo = max(fade_start, start)
+        span = start + length - lo
+        first = 1 - (lo - fade_start) / (fade_out - 1)
+        last = 1 - (lo + span - 1 - fade_start) / (fade_out - 1)
+        env = ramp(first, last, span, out=scratch[:span])
+        view = block[lo - start:]
+        np.multiply(view, env, out=view)
+    return block
+
+
+def write_wav_stream(filepath, sample_rate, blocks):
+    """把产出 [-1, 1] 范围 float 块的生成器逐块写成 16 位单声道 WAV，返回采样数"""
+    frames = 0
+    with wave.open(filepath, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        for block in blocks:
+            np.clip(block, -1.0, 1.0, out=block)
+            np.multiply(block, 32767, out=block)
+            wav.writeframes(block.astype("<i2").tobytes())
+            frames += len(block)
+    return frames
@@ -0,0 +1,104 @@
+"""带限波表振荡器
+
+方波、锯齿波和三角波直接由相位逐采样计算（np.sign、floor 运算）时含有无限多的谐波，
+高于奈奎斯特频率的部分会折叠回可听频段产生混叠。这里预先用傅里叶级数合成单周期波表，
+每个八度一张（mipmap），只保留该八度最高频率下不超过奈奎斯特频率的谐波，
+播放时按相位查表并线性插值。
+
+多种波形按相同相位叠加的音色（例如方波 + 三角波 + 正弦）可以合成为一张波表，
+一次查表代替对每种波形分别做若干次整段运算。波表按 (音色, 谐波数) 缓存，一次运行只构建一次。
+"""
+import functools
+import math
+
+import numpy as np
+
+from . import trace
+from .oscillator import BLOCK, DTYPE, phase
+
+# 单周期波表长度，最多容纳 TABLE_SIZE // 2 - 1 个谐波
+TABLE_SIZE = 2048
+
+# 最低八度的下边界（Hz），更低的基频使用谐波最多的那张表
+BASE_FREQ = 20.0
+
+# 各波形以 sin / cos 级数表示时的第 h 个谐波系数 (cos 系数, sin 系数)，
+# 相位约定与按相位 p ∈ [0, 1) 直接计算的波形一致：
+#   square:   p < 0.5 时为 1，否则为 -1，即 sign(0.5 - p)
+#   saw:      2p - 1
+#   triangle: 1 - 2|2p - 1|，p = 0 时为 -1，p = 0.5 时为 1
+_SHAPES = {
+    "sine": lambda h: (0.0, 1.0 if h == 1 else 0.0),
+    "square": lambda h: (0.0, 4 / (math.pi * h) if h % 2 else 0.0),
+    "saw": lambda h: (0.0, -2 / (math.pi * h)),
+    "triangle": lambda h: (-8 / (math.pi * h) ** 2 if h % 2 else 0.0, 0.0),
+}
+
+
+def _timbre(shapes):
+    """把 "square" 或 (("square", 0.3), ("sine", 0.2)) 统一为后者的形式"""
+    if isinstance(shapes, str):
+        shapes = ((shapes, 1.0),)
+    for shape, _ in shapes:
+        if shape not in _SHAPES:
+            raise ValueError(f"未知的波形 {shape}，可选: {sorted(_SHAPES)}")
+    return tuple((shape, float(gain)) for shape, gain in shapes)
+
+
+@functools.lru_cache(maxsize=256)
+def _table(timbre, harmonics):
+    """合成只含前 harmonics 个谐波的单周期波表，返回 (采样值, 相邻采样差值)
+
+    两者长度都为 TABLE_SIZE + 1，最后一项是第一项的重复：float32 相位乘以表长可能恰好等于
+    TABLE_SIZE，多存一项就不需要对下标取模。
+    """
+    spectrum = np.zeros(TABLE_SIZE // 2 + 1, dtype=complex)
+    for h in range(1, harmonics + 1):
+        for shape, gain in timbre:
+            a, b = _SHAPES[shape](h)
+            spectrum[h] += gain * (a - 1j * b)
+    table = np.fft.irfft(spectrum * (TABLE_SIZE / 2), TABLE_SIZE).astype(DTYPE)
+    wrapped = np.append(table, table[:2])
+    slope = np.diff(wrapped)
+    table = wrapped[:-1]
+    table.flags.writeable = False
+    slope.flags.writeable = False
+    return table, slope
+
+
+def max_harmonics(freq, sample_rate):
+    """基频 freq 所在八度使用的谐波数：该八度最高频率下不超过奈奎斯特频率"""
+    octave = max(0, math.ceil(math.log2(max(freq, BASE_FREQ) / BASE_FREQ)))
+    top = BASE_FREQ * 2 ** octave
+    return max(1, min(TABLE_SIZE // 2 - 1, int(sample_rate / 2 // top)))
+
+
+@trace.traced("wavetable", "oscillator")
+def wavetable(shapes, freq, n, sample_rate, out=None, amp=1.0, phase0=0.0):
+    """带限波表振荡器，shapes 为波形名称或 ((波形, 增益), ...) 的叠加音色
+
+    freq 可以是标量或逐采样的瞬时频率数组（按最高频率选择波表）。
+    """
+    timbre = _timbre(shapes)
+    top = float(np.max(freq)) if np.ndim(freq) else float(freq)
+    table, slope = _table(timbre, max_harmonics(top, sample_rate))
+
+    out = phase(freq, n, sample_rate, out=out, phase0=phase0)
+    np.multiply(out, DTYPE(TABLE_SIZE), out=out)
+    whole = np.empty(min(n, BLOCK), dtype=DTYPE)
+    index = np.empty(min(n, BLOCK), dtype=np.intp)
+    for start in range(0, n, BLOCK):
+        block = out[start:start + BLOCK]
+        m = len(block)
+        np.floor(block, out=whole[:m])
+        np.subtract(block, whole[:m], out=block)
+        idx = index[:m]
+        idx[...] = whole[:m]
+        # 下标总在 [0, TABLE_SIZE] 内，mode='clip' 省去默认模式的越界检查
+        np.take(slope, idx, out=whole[:m], mode='clip')
+        np.multiply(block, whole[:m], out=block)
+        np.take(table, idx, out=whole[:m], mode='clip')
+        np.add(block, whole[:m], out=block)
+    if amp != 1.0:
+        np.multiply(out, DTYPE(amp), out=out)
+    return out
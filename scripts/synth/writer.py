@@ -0,0 +1,105 @@
+"""原子、并发的文件写出
+
+直接写目标路径时，中断的运行会在资源目录里留下写了一半的文件。这里所有写出都先写到
+同一目录下的临时文件，再用 os.replace 原子地替换目标，读取方只会看到旧文件或完整的新文件。
+内容与磁盘上已有文件逐字节相同时跳过写入，文件的修改时间也保持不变。
+
+FileWriter 用一个 I/O 线程池在后台写出，渲染下一个提醒音的同时写出上一个；
+退出 with 块时等待所有写出完成，并抛出其中的第一个错误。
+"""
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from . import trace
+
+_TEMP_FLAGS = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0)
+
+
+def _create_temp(directory, name):
+    """在 directory 中独占地创建临时文件，返回 (fd, 路径)
+
+    与 mkstemp 不同，以 0666 创建，由内核按当前 umask 得到普通新文件的权限，不需要读取或改动 umask。
+    """
+    for _ in range(tempfile.TMP_MAX):
+        tmp_path = os.path.join(directory, f".{name}.{os.urandom(6).hex()}.tmp")
+        try:
+            return os.open(tmp_path, _TEMP_FLAGS, 0o666), tmp_path
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"无法在 {directory} 中创建临时文件")
+
+
+def _unchanged(path, data):
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+
+def write_atomic(path, data):
+    """把 bytes 原子地写入 path，内容未变时跳过，返回是否实际写入"""
+    with trace.stage("write", "io", path=path, bytes=len(data)):
+        if _unchanged(path, data):
+            return False
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = _create_temp(directory, os.path.basename(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                # 替换前落盘，掉电后不会出现名字已替换、内容却为空的文件
+                f.flush()
+                os.fsync(f.fileno())
+            # 覆盖已有文件时沿用其权限
+            try:
+                os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return True
+
+
+class FileWriter:
+    """在 I/O 线程池中原子地写出文件，submit() 立即返回
+
+    written / skipped 记录实际写入和内容未变跳过的路径，在 close() 之后完整。
+    """
+
+    def __init__(self, workers=4):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="writer")
+        self._futures = []
+        self.written = []
+        self.skipped = []
+
+    def submit(self, path, data):
+        """排队写出 data 到 path，返回 Future（结果为是否实际写入）"""
+        future = self._pool.submit(write_atomic, path, data)
+        self._futures.append((path, future))
+        return future
+
+    def close(self):
+        """等待所有排队的写出完成，有写出失败时抛出第一个错误"""
+        self._pool.shutdown(wait=True)
+        error = None
+        for path, future in self._futures:
+            try:
+                (self.written if future.result() else self.skipped).append(path)
+            except Exception as e:
+                error = error or e
+        self._futures = []
+        if error is not None:
+            raise error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False